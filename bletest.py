@@ -0,0 +1,439 @@
+import os
+import sys
+import types
+import argparse
+import tempfile
+import importlib.util
+
+# Хостовая проверка пульта Canon (apps/canon.py) без железа: поддельный ubluetooth
+# с моделью камер BR-E1 отдаёт IRQ по виртуальным часам, CanonRemoteBLE крутится
+# как из главного цикла (IRQ → poll()), сверяются переходы состояний _Link и тайминги
+SRC_DIR = "src"
+CANON = os.path.join(SRC_DIR, "apps", "canon.py")
+TICK_MS = 5               # шаг главного цикла
+
+# задержки модели камеры, мс
+CONNECT_MS = 80
+CONNECT_FAIL_MS = 2000    # gap_connect к недоступной камере: DISCONNECT с conn 0xFFFF
+ENCRYPT_MS = 150
+GATT_MS = 30
+DISCONNECT_MS = 30
+
+_IRQ_SCAN_RESULT = 5
+_IRQ_SCAN_DONE = 6
+_IRQ_PERIPHERAL_CONNECT = 7
+_IRQ_PERIPHERAL_DISCONNECT = 8
+_IRQ_GATTC_SERVICE_RESULT = 9
+_IRQ_GATTC_SERVICE_DONE = 10
+_IRQ_GATTC_CHARACTERISTIC_RESULT = 11
+_IRQ_GATTC_CHARACTERISTIC_DONE = 12
+_IRQ_ENCRYPTION_UPDATE = 28
+
+STATES = {0: "IDLE", 1: "CONNECT", 2: "CONNECTED", 3: "ENCRYPT", 4: "DISCOVER", 5: "READY", 6: "CLOSING"}
+
+
+class Clock:
+    """Виртуальные ticks_ms/ticks_us; sleep_ms двигает часы и считается (в poll() его быть не должно)."""
+    def __init__(self):
+        self.ms = 0
+        self.us_extra = 0
+        self.sleeps = 0
+
+    def module(self):
+        t = types.ModuleType("time")
+        t.ticks_ms = lambda: self.ms
+        t.ticks_add = lambda a, b: a + b
+        t.ticks_diff = lambda a, b: a - b
+        t.time = lambda: self.ms // 1000
+        t.sleep_ms = self.sleep_ms
+        t.sleep = lambda s: self.sleep_ms(int(s * 1000))
+        t.ticks_us = self.ticks_us
+        return t
+
+    def ticks_us(self):
+        self.us_extra += 40          # каждая запись в контроллер ~40 мкс
+        return self.ms * 1000 + self.us_extra
+
+    def sleep_ms(self, ms):
+        self.sleeps += 1
+        self.ms += ms
+
+
+class UUID:
+    def __init__(self, v):
+        self.v = v.lower() if isinstance(v, str) else v
+
+    def __eq__(self, other):
+        return isinstance(other, UUID) and self.v == other.v
+
+    def __hash__(self):
+        return hash(self.v)
+
+
+class FakeCam:
+    def __init__(self, n, name="Canon EOS", reachable=True):
+        self.addr_type = 0
+        self.addr = bytes([0xC0, 0xFF, 0xEE, 0, 0, n])
+        self.name = name
+        self.reachable = reachable
+        self.conn = None
+
+    def adv(self):
+        uuid_le = bytes(reversed(bytes.fromhex("00050000-0000-1000-0000-d8492fffa821".replace("-", ""))))
+        name = self.name.encode()
+        return bytes([17, 0x07]) + uuid_le + bytes([len(name) + 1, 0x09]) + name
+
+    def peer(self, handles=True):
+        d = {"addr_type": self.addr_type, "addr": list(self.addr), "name": self.name}
+        if handles:
+            d.update(h_init=12, h_ctrl=14)
+        return d
+
+
+class FakeBLE:
+    """ubluetooth.BLE в объёме, который использует CanonRemoteBLE; события — с задержкой по Clock."""
+    def __init__(self, clock, cams, canon_mod):
+        self.clock = clock
+        self.cams = cams
+        self.m = canon_mod
+        self.handler = None
+        self.events = []             # (due_ms, seq, event, data)
+        self.seq = 0
+        self.scanning = False
+        self.connecting = None       # камера с незавершённым gap_connect
+        self.next_conn = 1
+        self.writes = []             # (ms, cam, handle, data, mode)
+        self.max_conns = 0
+        self.calls = []
+
+    def _post(self, delay, event, data):
+        self.seq += 1
+        self.events.append((self.clock.ms + delay, self.seq, event, data))
+
+    def deliver(self):
+        """Отдать в IRQ все события, срок которых наступил. Возвращает их число."""
+        due = sorted(e for e in self.events if e[0] <= self.clock.ms)
+        for e in due:
+            self.events.remove(e)
+            event, data = e[2], e[3]
+            if event == _IRQ_PERIPHERAL_CONNECT:
+                cam = self._cam(data[2])
+                cam.conn = data[0]
+                self.connecting = None
+                self.max_conns = max(self.max_conns, sum(1 for c in self.cams if c.conn is not None))
+            elif event == _IRQ_PERIPHERAL_DISCONNECT:
+                cam = self._cam(data[2])
+                if data[0] == 0xFFFF:
+                    self.connecting = None
+                elif cam.conn != data[0]:
+                    continue             # уже разорвано
+                cam.conn = None
+            elif event == _IRQ_SCAN_DONE:
+                self.scanning = False
+            self.handler(event, data)
+        return len(due)
+
+    def _cam(self, addr):
+        for c in self.cams:
+            if c.addr == bytes(addr):
+                return c
+        raise KeyError(addr)
+
+    def _by_conn(self, conn):
+        for c in self.cams:
+            if c.conn == conn:
+                return c
+        raise OSError(107, "ENOTCONN")
+
+    def config(self, *a, **kw):
+        return None
+
+    def irq(self, handler):
+        self.handler = handler
+
+    def gap_scan(self, duration_ms, *a):
+        self.calls.append("gap_scan")
+        if duration_ms is None:
+            if self.scanning:
+                self.events = [e for e in self.events if e[2] not in (_IRQ_SCAN_RESULT, _IRQ_SCAN_DONE)]
+                self._post(0, _IRQ_SCAN_DONE, ())
+            return
+        if self.scanning:
+            raise OSError(114, "EALREADY")
+        self.scanning = True
+        for k, c in enumerate(self.cams):
+            if c.reachable:
+                self._post(50 + 20 * k, _IRQ_SCAN_RESULT, (c.addr_type, c.addr, 0, -60, c.adv()))
+        self._post(duration_ms, _IRQ_SCAN_DONE, ())
+
+    def gap_connect(self, addr_type, addr=None, *a):
+        self.calls.append("gap_connect")
+        if addr_type is None:
+            if self.connecting:
+                addr = self.connecting.addr
+                self.events = [e for e in self.events if not (
+                    e[3][2:3] == (addr,) and (e[2] == _IRQ_PERIPHERAL_CONNECT or e[3][0] == 0xFFFF))]
+                self.connecting = None
+            return
+        if self.connecting is not None or self.scanning:
+            raise OSError(114, "EALREADY")
+        cam = self._cam(addr)
+        self.connecting = cam
+        if cam.reachable:
+            self._post(CONNECT_MS, _IRQ_PERIPHERAL_CONNECT, (self.next_conn, addr_type, cam.addr))
+            self.next_conn += 1
+        else:
+            self._post(CONNECT_FAIL_MS, _IRQ_PERIPHERAL_DISCONNECT, (0xFFFF, addr_type, cam.addr))
+
+    def gap_pair(self, conn):
+        self._by_conn(conn)
+        self._post(ENCRYPT_MS, _IRQ_ENCRYPTION_UPDATE, (conn, 1, 0, 1, 16))
+
+    def gattc_exchange_mtu(self, conn):
+        self._by_conn(conn)
+
+    def gattc_discover_services(self, conn):
+        self._by_conn(conn)
+        self._post(GATT_MS, _IRQ_GATTC_SERVICE_RESULT, (conn, 1, 9, UUID(0x1800)))
+        self._post(GATT_MS, _IRQ_GATTC_SERVICE_RESULT, (conn, 10, 20, self.m.SERVICE_UUID))
+        self._post(GATT_MS + 1, _IRQ_GATTC_SERVICE_DONE, (conn, 0))
+
+    def gattc_discover_characteristics(self, conn, start, end):
+        self._by_conn(conn)
+        self._post(GATT_MS, _IRQ_GATTC_CHARACTERISTIC_RESULT, (conn, 11, 12, 0x0A, self.m.INIT_CHAR_UUID))
+        self._post(GATT_MS, _IRQ_GATTC_CHARACTERISTIC_RESULT, (conn, 13, 14, 0x0C, self.m.CTRL_CHAR_UUID))
+        self._post(GATT_MS + 1, _IRQ_GATTC_CHARACTERISTIC_DONE, (conn, 0))
+
+    def gattc_write(self, conn, handle, data, mode=0):
+        cam = self._by_conn(conn)
+        self.writes.append((self.clock.ms, cam, handle, bytes(data), mode))
+
+    def gap_disconnect(self, conn):
+        cam = self._by_conn(conn)
+        self._post(DISCONNECT_MS, _IRQ_PERIPHERAL_DISCONNECT, (conn, cam.addr_type, cam.addr))
+
+    def drop(self, cam):
+        """Обрыв со стороны камеры."""
+        self._post(0, _IRQ_PERIPHERAL_DISCONNECT, (cam.conn, cam.addr_type, cam.addr))
+
+
+class FakeApp:
+    def __init__(self):
+        self.sh = []
+
+    def set_sh(self, state):
+        self.sh.append(state)
+
+    def pair_done(self, ok):
+        pass
+
+
+def load_canon(clock, path=CANON):
+    """apps/canon.py с заглушками ubluetooth/M5/micropython и виртуальным time."""
+    bt = types.ModuleType("ubluetooth")
+    bt.UUID = UUID
+    bt.BLE = None
+    m5 = types.ModuleType("M5")
+    m5.__all__ = []
+    mp = types.ModuleType("micropython")
+    mp.const = lambda x: x
+    mp.schedule = lambda fn, arg: fn(arg)
+    apps = types.ModuleType("apps")
+    apps.__path__ = [os.path.dirname(path)]
+    sys.modules.update({"ubluetooth": bt, "M5": m5, "micropython": mp, "apps": apps, "time": clock.module()})
+    sys.modules.pop("apps.interval", None)
+    spec = importlib.util.spec_from_file_location("canon", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class Bench:
+    """Одна сцена: часы, камеры, пульт; run() — главный цикл с записью переходов."""
+    def __init__(self, cams, peers=(), handles=True, verbose=False, **kw):
+        self.clock = Clock()
+        self.m = load_canon(self.clock)
+        self.cams = cams
+        self.ble = FakeBLE(self.clock, cams, self.m)
+        self.app = FakeApp()
+        self.dir = tempfile.mkdtemp(prefix="bletest")
+        store = os.path.join(self.dir, "canon_peer.json")
+        if peers:
+            import json
+            with open(store, "w") as f:
+                json.dump({"current": 0, "cameras": [c.peer(handles) for c in peers]}, f)
+        self.r = self.m.CanonRemoteBLE(ble=self.ble, app=self.app, store=store, verbose=verbose, **kw)
+        self.trace = {}              # addr -> [имена состояний]
+        self.results = []            # (ms, ok)
+        self.poll_sleeps = 0
+        _benches.append(self)
+
+    def cb(self, ok):
+        self.results.append((self.clock.ms, ok))
+
+    def _record(self):
+        for addr, link in self.r._links.items():
+            t = self.trace.setdefault(addr, [])
+            name = STATES[link.state]
+            if not t or t[-1] != name:
+                t.append(name)
+
+    def run(self, ms, until=None):
+        end = self.clock.ms + ms
+        while self.clock.ms < end:
+            self.ble.deliver()
+            self._record()
+            s = self.clock.sleeps
+            self.r.poll()
+            self.poll_sleeps += self.clock.sleeps - s
+            self._record()
+            if until and until():
+                return
+            self.clock.ms += TICK_MS
+
+    def states(self, cam):
+        return self.trace.get(cam.addr, [])
+
+    def shots(self, cam=None):
+        return [w for w in self.ble.writes if w[3] == b"\x8C" and (cam is None or w[1] is cam)]
+
+
+_fails = []
+_benches = []
+
+
+def expect(cond, what):
+    print(("  ok    " if cond else "  FAIL  ") + what)
+    if not cond:
+        _fails.append(what)
+
+
+def scene_pair(verbose):
+    print("[pair] scan → connect → pair → discovery → handshake → disconnect")
+    cam = FakeCam(1)
+    b = Bench([cam], verbose=verbose)
+    b.r.request_pair(cb=b.cb)
+    b.run(3000)
+    expect(b.results[:1] and b.results[0][1], "cb(True)")
+    expect(b.states(cam) == ["CONNECT", "CONNECTED", "ENCRYPT", "DISCOVER", "READY", "CLOSING", "IDLE"],
+           "states " + " → ".join(b.states(cam)))
+    hs = [w for w in b.ble.writes if w[2] == 12]
+    expect(len(hs) == 1 and hs[0][3] == b"\x03" + b.r.my_name.encode(), "handshake 0x03+name in INIT")
+    peers = b.r.get_peers()
+    expect(len(peers) == 1 and peers[0].get("h_ctrl") == 14 and peers[0].get("h_init") == 12,
+           "peer saved with handles")
+    expect(b.app.sh[-1] == 0, "indicator back to 0")
+
+
+def scene_shot(verbose, handles):
+    tag = "saved handle" if handles else "discovery"
+    print(f"[shot/{tag}] connect → {'READY' if handles else 'discovery → READY'} → 0x8C → disconnect")
+    cam = FakeCam(1)
+    b = Bench([cam], peers=[cam], handles=handles, verbose=verbose)
+    b.r.request_shot(cb=b.cb, t_press=0)
+    b.run(2000)
+    want = ["CONNECT", "CONNECTED", "READY", "CLOSING", "IDLE"] if handles else \
+           ["CONNECT", "CONNECTED", "DISCOVER", "READY", "CLOSING", "IDLE"]
+    expect(b.states(cam) == want, "states " + " → ".join(b.states(cam)))
+    expect(len(b.shots(cam)) == 1 and b.shots(cam)[0][2] == 14, "one 0x8C to CTRL")
+    expect(b.results == [(b.shots(cam)[0][0], True)], "cb(True) right at the write")
+    print(f"        latency {b.r.last_shot_ms} ms")
+    expect(b.app.sh[:2] == [1, 2], "indicator 1 → 2")
+
+
+def scene_queue(verbose):
+    print("[queue] second shot requested while the first is still in discovery")
+    cam = FakeCam(1)
+    b = Bench([cam], peers=[cam], handles=False, verbose=verbose)
+    b.r.request_shot(cb=b.cb, t_press=0)
+    b.run(100)
+    expect("DISCOVER" in b.states(cam) or b.r._links[cam.addr].state == 1, "first shot in progress")
+    b.r.request_shot(cb=b.cb)
+    b.run(4000)
+    expect([ok for _, ok in b.results] == [True, True], "both callbacks ok, in order")
+    expect(len(b.shots(cam)) == 2, "two 0x8C writes")
+    expect(not b.r.busy(), "queue drained")
+
+
+def scene_keepalive(verbose):
+    print("[keep-alive] shot keeps the link, camera drop → reconnect, idle → disconnect")
+    cam = FakeCam(1)
+    b = Bench([cam], peers=[cam], verbose=verbose, keep_alive=True, idle_ms=3000)
+    b.r.request_shot(cb=b.cb, t_press=0)
+    b.run(500)
+    expect(b.states(cam) == ["CONNECT", "CONNECTED", "READY"], "stays READY after the shot")
+    b.ble.drop(cam)
+    b.run(1000)
+    expect(b.states(cam)[3:] == ["IDLE", "CONNECT", "CONNECTED", "READY"],
+           "drop → " + " → ".join(b.states(cam)[3:]))
+    t0 = b.clock.ms
+    b.r.request_shot(cb=b.cb)
+    b.run(100, until=lambda: len(b.results) == 2)
+    expect(len(b.shots(cam)) == 2 and b.clock.ms - t0 <= 2 * TICK_MS, f"warm shot in {b.clock.ms - t0} ms")
+    b.run(4000)
+    expect(b.states(cam)[-2:] == ["CLOSING", "IDLE"], "idle timeout disconnects")
+
+
+def scene_lost(verbose):
+    print("[lost] camera drops during discovery → reconnect within the op deadline")
+    cam = FakeCam(1)
+    b = Bench([cam], peers=[cam], handles=False, verbose=verbose)
+    b.r.request_shot(cb=b.cb, t_press=0)
+    b.run(300, until=lambda: b.r._links.get(cam.addr) and b.r._links[cam.addr].state == 4)
+    b.ble.drop(cam)
+    b.run(3000)
+    expect(b.results[:1] and b.results[0][1], "cb(True) after reconnect")
+    expect(b.states(cam).count("CONNECT") == 2, "two connect attempts")
+
+
+def scene_timeout(verbose):
+    print("[timeout] camera unreachable → cb(False) at the op deadline")
+    cam = FakeCam(1, reachable=False)
+    b = Bench([cam], peers=[cam], verbose=verbose)
+    b.r.request_shot(cb=b.cb, t_press=0, timeout_ms=5000)
+    b.run(7000)
+    expect(len(b.results) == 1 and not b.results[0][1], "cb(False)")
+    expect(b.results and 5000 <= b.results[0][0] <= 5000 + 2 * TICK_MS, f"at {b.results and b.results[0][0]} ms")
+    expect(not b.shots(), "nothing written")
+
+
+def scene_multi(verbose, n_down=0):
+    print(f"[multi] burst to 3 cameras{f', {n_down} unreachable' if n_down else ''}")
+    cams = [FakeCam(k, reachable=k >= n_down) for k in range(3)]
+    b = Bench(cams, peers=cams, verbose=verbose)
+    b.r.request_multi_shot(cb=b.cb, t_press=0)
+    b.run(20000)
+    fired = 3 - n_down
+    expect(b.r.last_burst_n == (fired, 3), f"fired {b.r.last_burst_n}")
+    expect(len(b.results) == 1 and b.results[0][1] == (n_down == 0), f"cb({n_down == 0})")
+    ts = [w[0] for w in b.shots()]
+    expect(len(ts) == fired and len(set(ts)) == 1, "all 0x8C in one poll()")
+    expect(b.ble.max_conns <= b.m.MULTI_MAX, f"max {b.ble.max_conns} links at once")
+    for c in cams[n_down:]:
+        expect(b.states(c)[-2:] == ["CLOSING", "IDLE"], f"cam {c.addr[-1]} disconnected after burst")
+    expect(b.r.last_shot_ms < b.m.OP_TIMEOUT_MS["multi"] // 2,
+           f"latency {b.r.last_shot_ms} ms well below the {b.m.OP_TIMEOUT_MS['multi']} ms timeout")
+    ok = [t for t in b.r.last_burst if t >= 0]
+    expect(b.r.last_spread_us == (max(ok) - min(ok) if len(ok) >= 2 else None),
+           "spread over fired cameras only")
+    print(f"        latency {b.r.last_shot_ms} ms, spread {b.r.last_spread_us} us")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Проверка автомата Canon BLE на поддельном ubluetooth")
+    p.add_argument("-v", "--verbose", action="store_true", help="печать отладки CanonRemoteBLE")
+    args = p.parse_args()
+
+    scene_pair(args.verbose)
+    scene_shot(args.verbose, True)
+    scene_shot(args.verbose, False)
+    scene_queue(args.verbose)
+    scene_keepalive(args.verbose)
+    scene_lost(args.verbose)
+    scene_timeout(args.verbose)
+    scene_multi(args.verbose)
+    scene_multi(args.verbose, n_down=1)
+    scene_multi(args.verbose, n_down=2)
+    expect(all(b.poll_sleeps == 0 for b in _benches), "poll() never sleeps (UI loop stays responsive)")
+    print("[OK]" if not _fails else f"[FAIL] {len(_fails)} checks")
+    sys.exit(1 if _fails else 0)
@@ -0,0 +1,173 @@
+import os
+import struct
+import hashlib
+import json
+import gzip
+import subprocess
+import argparse
+
+# Хостовая сборка артефактов для устройства (результат кладётся в src/, дальше sync.py)
+SRC_DIR = "src"
+APPS_DIR = os.path.join(SRC_DIR, "apps")
+MPY_DIR = os.path.join(APPS_DIR, "__mpy__")
+
+# mpy-cross должен совпадать по версии байткода с прошивкой;
+# xtensawin нужен для @micropython.native/viper на ESP32
+MPY_CROSS = "mpy-cross"
+MPY_ARCH = "xtensawin"
+
+
+def file_hash(path):
+    """sha256 (hex) — тот же ключ, что считает main.MpyCache на устройстве."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_mpy(apps_dir=APPS_DIR, out_dir=MPY_DIR, mpy_cross=MPY_CROSS, arch=MPY_ARCH):
+    """Скомпилировать apps/*.py в apps/__mpy__/*.mpy и записать index.json (size/hash)."""
+    os.makedirs(out_dir, exist_ok=True)
+    index = {}
+    for fname in sorted(os.listdir(apps_dir)):
+        if not fname.endswith(".py"):
+            continue
+        base = fname[:-3]
+        src = os.path.join(apps_dir, fname)
+        dst = os.path.join(out_dir, base + ".mpy")
+        cmd = [mpy_cross, "-march=" + arch, "-s", "apps/" + fname, "-o", dst, src]
+        try:
+            subprocess.check_output(cmd, stderr=subprocess.STDOUT)
+        except (OSError, subprocess.CalledProcessError) as e:
+            out = getattr(e, "output", b"") or b""
+            print(f"[ERR] {fname}: {e}\n{out.decode()}")
+            continue
+        # mtime на устройстве другой (ставится при заливке) — его досчитает сам MpyCache
+        index[base] = {"size": os.path.getsize(src), "mtime": None, "hash": file_hash(src)}
+        print(f"[MPY] {src} -> {dst} ({os.path.getsize(dst)} b)")
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump(index, f)
+    return index
+
+
+def build_apps(apps_dir=APPS_DIR):
+    """Манифест приложений apps/index.json (как main.build_app_index): на устройстве
+    он не пересобирается при каждой загрузке."""
+    apps = []
+    for fname in sorted(os.listdir(apps_dir)):
+        if not fname.endswith(".py"):
+            continue
+        path = os.path.join(apps_dir, fname)
+        radios = []
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        if not any(line.startswith("class App") for line in text.splitlines()):
+            continue
+        if "bluetooth" in text or ".ble" in text:
+            radios.append("ble")
+        if "import network" in text:
+            radios.append("wifi")
+        name = fname[:-3]
+        apps.append({"name": name, "path": "apps/" + fname, "icon": name + ".bmp",
+                     "entry": "App", "mem": os.path.getsize(path), "radios": radios})
+    out = os.path.join(apps_dir, "index.json")
+    with open(out, "w") as f:
+        json.dump({"apps": apps}, f)
+    print(f"[APPS] {len(apps)} apps -> {out}")
+    return apps
+
+
+def bmp_to_p16(src, dst):
+    """24/32-битный BMP -> P16 (заголовок "P16 w h\\n" + строки RGB565 big-endian сверху вниз)."""
+    with open(src, "rb") as f:
+        data = f.read()
+    if data[:2] != b"BM":
+        raise ValueError("not a BMP")
+    off = struct.unpack_from("<I", data, 10)[0]
+    w, h, _planes, bpp, comp = struct.unpack_from("<iiHHI", data, 18)
+    if bpp not in (24, 32) or comp not in (0, 3):
+        raise ValueError(f"unsupported BMP: {bpp} bpp, compression {comp}")
+    bottom_up = h > 0
+    h = abs(h)
+    px = bpp // 8
+    stride = (w * px + 3) & ~3
+    out = bytearray(f"P16 {w} {h}\n".encode())
+    for y in range(h):
+        row = off + (h - 1 - y if bottom_up else y) * stride
+        for x in range(w):
+            b, g, r = data[row + x * px: row + x * px + 3]
+            out += struct.pack(">H", ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3))
+    with open(dst, "wb") as f:
+        f.write(out)
+    return w, h
+
+
+def build_icons(apps_dir=APPS_DIR):
+    """apps/*.bmp -> apps/*.p16 для IconCache (raw RGB565 без разбора BMP на устройстве)."""
+    for fname in sorted(os.listdir(apps_dir)):
+        if not fname.lower().endswith(".bmp"):
+            continue
+        src = os.path.join(apps_dir, fname)
+        dst = os.path.join(apps_dir, fname[:-4] + ".p16")
+        try:
+            w, h = bmp_to_p16(src, dst)
+        except (OSError, ValueError) as e:
+            print(f"[ERR] {fname}: {e}")
+            continue
+        print(f"[ICON] {src} -> {dst} ({w}x{h})")
+
+
+def build_gz(apps_dir=APPS_DIR, exts=(".html",)):
+    """apps/*.html -> apps/*.html.gz: портал отдаёт их как есть (Content-Encoding: gzip).
+    mtime=0 — одинаковый вход даёт одинаковый .gz (и тот же ETag на устройстве)."""
+    for fname in sorted(os.listdir(apps_dir)):
+        if not fname.endswith(exts):
+            continue
+        src = os.path.join(apps_dir, fname)
+        dst = src + ".gz"
+        with open(src, "rb") as f:
+            data = f.read()
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        with open(dst, "wb") as f:
+            f.write(packed)
+        print(f"[GZ] {src} -> {dst} ({len(data)} -> {len(packed)} b)")
+
+
+def build_ir(out=os.path.join(APPS_DIR, "tvcodes.irp")):
+    """Коды tvcodes.py по регионам -> файл развёрнутых цепочек (apps/irpulse.py: формат и разворот)."""
+    import irtool
+    irp = irtool.load_irpulse()
+    regions = []
+    for region, var in irtool.REGIONS:
+        codes = irtool.load_codes(name=var)
+        regions.append((region, [irp.expand(c[:5]) for c in codes]))
+    irp.write_db(out, regions)
+    for region, trains in regions:
+        print(f"[IR] {region}: {len(trains)} codes, {sum(len(t[1]) for t in trains)} items")
+    print(f"[IR] -> {out} ({os.path.getsize(out)} b)")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Сборка артефактов для PhotoMultitool")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("mpy", help="байткод приложений (mpy-cross)")
+    s.add_argument("--mpy-cross", default=MPY_CROSS)
+    s.add_argument("--arch", default=MPY_ARCH)
+    sub.add_parser("apps", help="манифест приложений apps/index.json")
+    sub.add_parser("icons", help="иконки .bmp -> .p16 (RGB565)")
+    sub.add_parser("gz", help="страницы портала .html -> .html.gz")
+    sub.add_parser("ir", help="ИК-коды TVOff -> apps/tvcodes.irp")
+    args = p.parse_args()
+
+    if args.cmd == "mpy":
+        build_mpy(mpy_cross=args.mpy_cross, arch=args.arch)
+        build_apps()
+    elif args.cmd == "apps":
+        build_apps()
+    elif args.cmd == "icons":
+        build_icons()
+    elif args.cmd == "gz":
+        build_gz()
+    elif args.cmd == "ir":
+        build_ir()
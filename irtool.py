@@ -0,0 +1,252 @@
+import os
+import ast
+import sys
+import argparse
+import importlib.util
+
+# Хостовая проверка ИК-кодов TVOff: цепочки импульсов из apps/irpulse.expand
+# (то, что уходит в RMT) сверяются с исходными таблицами времён tvcodes.py
+SRC_DIR = "src"
+TVCODES = "tvcodes.py"
+REGIONS = (("EU", "EUCODES"), ("NA", "NACODES"))
+IR_DB = os.path.join(SRC_DIR, "apps", "tvcodes.irp")
+IRPULSE = os.path.join(SRC_DIR, "apps", "irpulse.py")
+TVOFF = os.path.join(SRC_DIR, "apps", "TVOff.py")
+
+# Рейтинг популярности для TVOff.PRIORITY: брендов в таблицах нет, семейство протокола
+# узнаётся по несущей и заголовку (первые mark/space). Вес — примерная доля марок
+# на рынке ТВ Европы, %; коды семейств чередуются пропорционально весу
+FAMILIES = (
+    ("samsung", "Samsung", 30),
+    ("nec", "LG/Toshiba/Hisense/TCL (NEC)", 25),
+    ("sirc", "Sony", 10),
+    ("rc6", "Philips (RC6)", 8),
+    ("rc5", "Philips (RC5)", 6),
+    ("kaseikyo", "Panasonic", 6),
+    ("sharp", "Sharp", 3),
+    ("jvc", "JVC", 2),
+)
+
+
+def load_irpulse(path=IRPULSE):
+    spec = importlib.util.spec_from_file_location("irpulse", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def load_codes(path=TVCODES, name="EUCODES"):
+    """Таблицы t_*/b_* и список кодов name из исходника tvcodes.py (с именами таблиц для отчёта)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    tables = {}
+    codes = None
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)):
+            continue
+        var = node.targets[0].id
+        v = node.value
+        if isinstance(v, ast.Call) and getattr(v.func, "id", "") == "array":
+            tables[var] = list(ast.literal_eval(v.args[1]))
+        elif isinstance(v, ast.Call) and getattr(v.func, "id", "") == "bytes":
+            tables[var] = bytes(ast.literal_eval(v.args[0]))
+        elif var == name:
+            codes = [(ast.literal_eval(e.elts[0]), ast.literal_eval(e.elts[1]), ast.literal_eval(e.elts[2]),
+                      e.elts[3].id, e.elts[4].id) for e in v.elts]
+    if codes is None:
+        raise ValueError(f"{name} not found in {path}")
+    return [(f, n, bpi, tables[t], tables[b], t, b) for f, n, bpi, t, b in codes]
+
+
+def reference_runs(numpairs, bpi, times, packed, unit_us):
+    """Независимо от irpulse: индексы пар из битового потока, затем mark/space в мкс
+    с тем же смыслом, что у прежнего PWM-цикла (нулевая пауза — mark продолжается)."""
+    bits = int.from_bytes(packed, "big")
+    nbits = len(packed) * 8
+    runs = []
+    for k in range(numpairs):
+        idx = (bits >> (nbits - (k + 1) * bpi)) & ((1 << bpi) - 1)
+        for level, us in ((1, times[2 * idx] * unit_us), (0, times[2 * idx + 1] * unit_us)):
+            if not us:
+                continue
+            if runs and runs[-1][0] == level:
+                runs[-1][1] += us
+            elif runs or level:
+                runs.append([level, us])
+    return runs
+
+
+def decode(items, max_item):
+    """Цепочка (мкс | бит уровня 15) -> [(уровень, мкс)]: проверка ограничений и склейка кусков."""
+    runs = []
+    for it in items:
+        d, lv = it & 0x7FFF, it >> 15
+        if not 0 < d <= max_item:
+            raise ValueError(f"item {d} us out of range")
+        if runs and runs[-1][0] == lv:
+            if runs[-1][2] != max_item:
+                raise ValueError("split item not at max length")
+            runs[-1][1] += d
+            runs[-1][2] = d
+        else:
+            runs.append([lv, d, d])
+    if runs and runs[0][0] != 1:
+        raise ValueError("train does not start with a mark")
+    return [[lv, us] for lv, us, _ in runs]
+
+
+def check(codes, irp, db_path=None, region="EU"):
+    """Цепочки против таблиц; с db_path — ещё и регион файла базы против expand()."""
+    db = None
+    if db_path and os.path.exists(db_path):
+        try:
+            db = irp.IRDB(db_path, region)
+        except ValueError as e:
+            print(f"[ERR] {db_path}: {e} (build.py ir)")
+            return False
+        if len(db) != len(codes):
+            print(f"[ERR] {db_path} {region}: {len(db)} codes, expected {len(codes)} (build.py ir)")
+            return False
+    bad = 0
+    items = 0
+    longest = (0, None)
+    for n, (freq, numpairs, bpi, times, packed, tname, bname) in enumerate(codes):
+        try:
+            f, train = irp.expand((freq, numpairs, bpi, times, packed))
+            got = decode(train, irp.RMT_MAX)
+            want = reference_runs(numpairs, bpi, times, packed, irp.UNIT_US)
+            if f != freq or got != want:
+                raise ValueError("pulse train differs from times table")
+            if db:
+                f, k = db.read(n)
+                if f != freq or list(db.buf[:k]) != list(train):
+                    raise ValueError(f"{db_path} differs from expand() (build.py ir)")
+        except (ValueError, IndexError) as e:
+            bad += 1
+            print(f"[ERR] #{n} {tname}/{bname}: {e}")
+            continue
+        items += len(train)
+        total = sum(it & 0x7FFF for it in train)
+        if total > longest[0]:
+            longest = (total, n)
+    if db:
+        db.close()
+    print(f"[IR] {region}: {len(codes)} codes, {items} RMT items, longest #{longest[1]} {longest[0] / 1000:.1f} ms"
+          + (f", {db_path} matches" if db and not bad else ""))
+    print("[OK]" if not bad else f"[FAIL] {bad} codes")
+    return bad == 0
+
+
+def family(freq, train):
+    """Семейство протокола по несущей и заголовку цепочки; None — не распознано."""
+    if len(train) < 2 or not train[0] >> 15 or train[1] >> 15:
+        return None
+    m, s = train[0] & 0x7FFF, train[1] & 0x7FFF
+    if 36000 <= freq <= 40000 and 4200 <= m <= 4800 and 4200 <= s <= 4800:
+        return "samsung"              # Samsung32: 4.5/4.5 мс
+    if 36000 <= freq <= 40000 and (8700 <= m <= 9300 or 7800 <= m <= 8100) and 3900 <= s <= 4700:
+        return "nec"                  # NEC: 9/4.5 мс (и вариант 8/4 мс)
+    if 36000 <= freq <= 41000 and 8300 <= m <= 8600 and 4000 <= s <= 4400:
+        return "jvc"                  # JVC: 8.4/4.2 мс
+    if 35000 <= freq <= 37000 and 2400 <= m <= 2900 and 800 <= s <= 1000:
+        return "rc6"                  # RC6: лидер 2.67 мс + 0.89 мс
+    if 35000 <= freq <= 37000 and 800 <= m <= 1900 and 800 <= s <= 1000:
+        return "rc5"                  # RC5: бифазный, 0.89 мс
+    if 38000 <= freq <= 41000 and 2200 <= m <= 2600 and 500 <= s <= 700:
+        return "sirc"                 # Sony SIRC: 2.4/0.6 мс
+    if 36000 <= freq <= 38000 and 3200 <= m <= 3700 and 1500 <= s <= 1900:
+        return "kaseikyo"             # Panasonic: 3.5/1.75 мс
+    if 36000 <= freq <= 40000 and 150 <= m <= 350 and (700 <= s <= 900 or 1700 <= s <= 2000):
+        return "sharp"                # Sharp: без заголовка, mark 0.3 мс
+    return None
+
+
+def ranking(codes, irp, families=FAMILIES):
+    """Индексы кодов для TVOff.PRIORITY: семейства по очереди пропорционально весу
+    (метод Д'Ондта), внутри семейства — исходный порядок; нераспознанные не входят."""
+    groups = {key: [] for key, _, _ in families}
+    for i, c in enumerate(codes):
+        fam = family(*irp.expand(c[:5]))
+        if fam in groups:
+            groups[fam].append(i)
+    taken = {key: 0 for key in groups}
+    weight = {key: w for key, _, w in families}
+    out = []
+    while any(taken[k] < len(groups[k]) for k in groups):
+        key = max((k for k in groups if taken[k] < len(groups[k])),
+                  key=lambda k: weight[k] / (taken[k] + 1))
+        out.append(groups[key][taken[key]])
+        taken[key] += 1
+    return out, groups
+
+
+def tvoff_priority(path=TVOFF):
+    """PRIORITY из исходника TVOff.py (без импорта: M5/machine)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and getattr(node.targets[0], "id", "") == "PRIORITY"):
+            return {k: list(v) for k, v in ast.literal_eval(node.value).items()}
+    raise ValueError(f"PRIORITY not found in {path}")
+
+
+def plan_report(irp, db_path=IR_DB, region="EU", ranking=(), window=None, delay_ms=10,
+                milestones=(1, 5, 10, 25, 50, 100)):
+    """План обхода TVOff без железа: смены несущей и оценка мс до N-го кода (эфир + пауза)."""
+    window = irp.PLAN_WINDOW if window is None else window
+    with irp.IRDB(db_path, region) as db:
+        freqs, air = [], []
+        for i in range(len(db)):
+            f, n = db.read(i)
+            freqs.append(f)
+            air.append(sum(it & 0x7FFF for it in db.buf[:n]) / 1000 + delay_ms)
+    for name, order in (("original", list(range(len(freqs)))),
+                        ("ranked", list(irp.plan(freqs, ranking, 1))),
+                        (f"planned/{window}", list(irp.plan(freqs, ranking, window)))):
+        t, at = 0, {}
+        for k, i in enumerate(order, 1):
+            t += air[i]
+            if k in milestones or k == len(order):
+                at[k] = t
+        marks = ", ".join(f"#{k} {v:.0f}" for k, v in at.items())
+        print(f"[PLAN] {region} {name}: {irp.switches(freqs, order)} carrier switches; ms: {marks}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Проверка/сборка ИК-кодов TVOff")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("check", help="цепочки импульсов против таблиц времён")
+    pp = sub.add_parser("plan", help="порядок обхода TVOff: смены несущей, время до N-го кода")
+    pp.add_argument("--region", default="EU")
+    pp.add_argument("--rank", default="", help="индексы кодов по популярности через запятую (по умолчанию TVOff.PRIORITY)")
+    pp.add_argument("--window", type=int, default=None, help="окно группировки (по умолчанию PLAN_WINDOW)")
+    sub.add_parser("rank", help="семейства протоколов и PRIORITY для TVOff.py")
+    args = p.parse_args()
+
+    if args.cmd == "check":
+        irp = load_irpulse()
+        ok = [check(load_codes(name=var), irp, IR_DB, region) for region, var in REGIONS]
+        want = {region: ranking(load_codes(name=var), irp)[0] for region, var in REGIONS}
+        if tvoff_priority() != want:
+            print(f"[ERR] {TVOFF}: PRIORITY differs from irtool.py rank")
+            ok.append(False)
+        sys.exit(0 if all(ok) else 1)
+    elif args.cmd == "rank":
+        irp = load_irpulse()
+        names = {key: name for key, name, _ in FAMILIES}
+        prio = {}
+        for region, var in REGIONS:
+            codes = load_codes(name=var)
+            prio[region], groups = ranking(codes, irp)
+            for key, idx in groups.items():
+                if idx:
+                    print(f"[RANK] {region} {names[key]}: {idx}")
+            print(f"[RANK] {region}: {len(prio[region])} of {len(codes)} codes ranked")
+        print("PRIORITY = {" + ", ".join(f'"{r}": ({", ".join(map(str, v))}{"," if len(v) == 1 else ""})'
+                                         for r, v in prio.items()) + "}")
+    elif args.cmd == "plan":
+        rank = [int(x) for x in args.rank.split(",") if x.strip()] if args.rank else \
+            tvoff_priority().get(args.region, [])
+        plan_report(load_irpulse(), IR_DB, args.region, rank, args.window)
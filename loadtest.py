@@ -0,0 +1,108 @@
+import time
+import socket
+import argparse
+import threading
+
+# Нагрузочная проверка captive-портала FrzLight с хоста (подключиться к Wi-Fi "FrzLight ...")
+# Параллельные клиенты шлют probe-запросы телефонов/ноутбуков; часть — по keep-alive
+HOST = "192.168.4.1"
+PORT = 80
+PROBES = ("/generate_204", "/hotspot-detect.html", "/ncsi.txt", "/connecttest.txt", "/gen_204")
+
+
+def _read_response(sock, buf):
+    """Один ответ HTTP/1.1 (Content-Length); (status, keep, остаток буфера)."""
+    while b"\r\n\r\n" not in buf:
+        data = sock.recv(4096)
+        if not data:
+            raise ConnectionError("closed before headers")
+        buf += data
+    head, _, buf = buf.partition(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    keep = True
+    for ln in lines[1:]:
+        k, _, v = ln.partition(b":")
+        k = k.strip().lower()
+        if k == b"content-length":
+            length = int(v)
+        elif k == b"connection":
+            keep = v.strip().lower() != b"close"
+    while len(buf) < length:
+        data = sock.recv(4096)
+        if not data:
+            raise ConnectionError("closed in body")
+        buf += data
+    return status, keep, buf[length:]
+
+
+def _client(host, port, n_req, per_conn, timeout, out, lock):
+    lat, codes, errors = [], {}, 0
+    sent = 0
+    while sent < n_req:
+        try:
+            s = socket.create_connection((host, port), timeout=timeout)
+        except OSError:
+            errors += 1
+            sent += 1
+            continue
+        buf = b""
+        try:
+            for i in range(min(per_conn, n_req - sent)):
+                path = PROBES[sent % len(PROBES)]
+                last = i == per_conn - 1 or sent == n_req - 1
+                req = (f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Connection: {'close' if last else 'keep-alive'}\r\n\r\n").encode()
+                t0 = time.perf_counter()
+                s.sendall(req)
+                status, keep, buf = _read_response(s, buf)
+                lat.append(time.perf_counter() - t0)
+                codes[status] = codes.get(status, 0) + 1
+                sent += 1
+                if not keep:
+                    break
+        except OSError:
+            errors += 1
+            sent += 1
+        finally:
+            s.close()
+    with lock:
+        out["lat"] += lat
+        out["errors"] += errors
+        for k, v in codes.items():
+            out["codes"][k] = out["codes"].get(k, 0) + v
+
+
+def run(host=HOST, port=PORT, clients=8, requests=50, per_conn=5, timeout=10):
+    """clients потоков по requests запросов, по per_conn на соединение (1 — без keep-alive)."""
+    out = {"lat": [], "errors": 0, "codes": {}}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=_client, args=(host, port, requests, per_conn, timeout, out, lock))
+               for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    dt = time.perf_counter() - t0
+    lat = sorted(out["lat"])
+    ok = out["codes"].get(200, 0)
+    print(f"[LOAD] {clients} clients x {requests} req, {per_conn}/conn: {dt:.2f} s, {ok / max(dt, 1e-6):.1f} req/s")
+    if lat:
+        pct = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1000
+        print(f"[LAT] p50 {pct(0.5):.1f} ms, p90 {pct(0.9):.1f} ms, p99 {pct(0.99):.1f} ms, max {lat[-1] * 1000:.1f} ms")
+    print(f"[HTTP] {dict(sorted(out['codes'].items()))}, errors {out['errors']}")
+    return out
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Нагрузочный тест captive-портала FrzLight")
+    p.add_argument("--host", default=HOST)
+    p.add_argument("--port", type=int, default=PORT)
+    p.add_argument("-c", "--clients", type=int, default=8)
+    p.add_argument("-n", "--requests", type=int, default=50, help="запросов на клиента")
+    p.add_argument("-k", "--per-conn", type=int, default=5, help="запросов на соединение (1 — без keep-alive)")
+    p.add_argument("--timeout", type=float, default=10)
+    args = p.parse_args()
+    run(args.host, args.port, args.clients, args.requests, args.per_conn, args.timeout)
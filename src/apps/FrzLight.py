@@ -1,6 +1,11 @@
 import network, socket, time
 import struct, json
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
 import machine
+import binascii
 import os
 from M5 import *
 from apps.Canon import CanonRemoteBLE
@@ -28,6 +33,8 @@ def _ensure_dir(path: str):
 
 # --------------------------- DNS ---------------------------
 
+DNS_IDLE_S = 0.005                # пауза опроса UDP-сокета без пакетов
+
 class _DNSServer:
     def __init__(self, ip="192.168.4.1", port=53):
         self.ip_bytes = _ip2bytes(ip)
@@ -69,28 +76,106 @@ class _DNSServer:
             return None
 
     def poll(self):
+        """Ответить на один запрос, если он есть; True — пакет был."""
         if not self.sock:
-            return
+            return False
         try:
             data, addr = self.sock.recvfrom(512)
         except:
-            return
+            return False
         resp = self._build_resp(data)
         if resp:
             try:
                 self.sock.sendto(resp, addr)
             except:
                 pass
+        return True
+
+    async def serve(self):
+        # пачку запросов разбираем подряд, без пакетов — отдаём цикл HTTP-задачам
+        while self.sock:
+            if self.poll():
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(DNS_IDLE_S)
 
 # --------------------------- HTTP ---------------------------
 
+IMG_PATH = "apps/led.ppm"
+IMG_PART = "apps/led.part"        # недокачанный файл: его размер = подтверждённое смещение
+IMG_META = "apps/led.part.json"   # {"size", "crc", "name"} текущей загрузки
+CHUNK_MAX = 8192                  # максимум тела /img/chunk (буфер выделяется один раз)
+
+MAX_CLIENTS = 4                   # одновременных соединений; сверх — 503 и закрыть
+SLOT_WAIT_TRIES = 10              # по 50 мс ждать свободный слот до 503
+HEADER_TIMEOUT_S = 5              # на строку запроса/заголовки
+KEEPALIVE_S = 5                   # простой keep-alive соединения между запросами
+MAX_REQUESTS = 32                 # запросов на одно keep-alive соединение
+MAX_HEADER_LINES = 40
+STATIC_CHUNK = 1024               # кусок отдачи страницы с flash
+TEXT = b"text/plain; charset=utf-8"
+
+
+def _parse_qs(qs):
+    out = {}
+    for kv in qs.split(b"&"):
+        k, _, v = kv.partition(b"=")
+        if k:
+            out[k] = v
+    return out
+
+
+def _unquote(b):
+    # %XX и '+' из query string -> str
+    out = bytearray()
+    i = 0
+    while i < len(b):
+        c = b[i]
+        if c == 0x25 and i + 2 < len(b):
+            try:
+                out.append(int(b[i + 1:i + 3], 16))
+                i += 3
+                continue
+            except ValueError:
+                pass
+        out.append(0x20 if c == 0x2B else c)
+        i += 1
+    try:
+        return bytes(out).decode()
+    except:
+        return ""
+
+
+async def _readinto(reader, mv):
+    # Stream.readinto есть в MicroPython asyncio; в CPython (нагрузочный тест на хосте) — read()
+    try:
+        return await reader.readinto(mv)
+    except AttributeError:
+        data = await reader.read(len(mv))
+        mv[:len(data)] = data
+        return len(data)
+
+
+async def _close(writer):
+    try:
+        writer.close()
+        await writer.wait_closed()
+    except:
+        pass
+
+
 class _HTTPServer:
+    """
+    asyncio-сервер портала: каждое соединение — своя задача, медленный клиент
+    не держит остальных и DNS. Keep-alive (HTTP/1.1 по умолчанию, до MAX_REQUESTS
+    на соединение, KEEPALIVE_S простоя), не больше MAX_CLIENTS одновременно.
+    """
     CAPTIVE_PATHS = (
         b"/generate_204", b"/gen_204",
         b"/hotspot-detect.html", b"/ncsi.txt", b"/connecttest.txt"
     )
 
-    def __init__(self, ip="192.168.4.1", port=80, html_path="apps/settings.html", fallback_html=None):
+    def __init__(self, ip="192.168.4.1", port=80, html_path="apps/settings.html", fallback_html=None, lib=None):
         self.ip = ip
         self.port = port
         self.html_path = html_path
@@ -102,152 +187,322 @@ class _HTTPServer:
             "<p>File not found: {path}</p>"
             "<p>Create <code>{path}</code> on the device.</p>"
         )
-        self.sock = None
-
-    # --- file helpers ---
-
-    def _read_file(self):
-        try:
-            with open(self.html_path, "rb") as f:
-                return f.read()
-        except:
-            html = self.fallback_html.replace("{path}", self.html_path)
-            return html.encode()
+        self.server = None
+        self.active = 0                   # открытых соединений
+        self.served = 0                   # запросов всего
+        self.rejected = 0                 # отбито по MAX_CLIENTS
+        self._chunk = None                # bytearray(CHUNK_MAX), при первой загрузке
+        self._upload = asyncio.Lock()     # _chunk и IMG_PART — одна загрузка за раз
+        self._sbuf = None                 # bytearray(STATIC_CHUNK) для отдачи страницы
+        self._page = {}                   # кэш _asset(): gzip_ok -> (файл, gz, размер, etag) | None
+        self.lib = lib                    # ImageLibrary приложения; иначе своя при первой загрузке
+
+    # --- static ---
+
+    def _asset(self, gzip_ok=True):
+        """(файл, gzip?, размер, etag) страницы или None. Предпочитается html_path + ".gz"
+        из build.py gz; ETag = CRC32 отдаваемого файла, считается один раз на сервер."""
+        if gzip_ok not in self._page:
+            self._page[gzip_ok] = None
+            cands = ((self.html_path + ".gz", True), (self.html_path, False))
+            for fn, gz in cands if gzip_ok else cands[1:]:
+                try:
+                    size = os.stat(fn)[6]
+                except OSError:
+                    continue
+                crc = 0
+                buf = self._static_buf()
+                with open(fn, "rb") as f:
+                    while True:
+                        n = f.readinto(buf)
+                        if not n:
+                            break
+                        crc = binascii.crc32(memoryview(buf)[:n], crc)
+                self._page[gzip_ok] = (fn, gz, size, ('"%08x"' % (crc & 0xFFFFFFFF)).encode())
+                break
+        return self._page[gzip_ok]
+
+    def _static_buf(self):
+        if self._sbuf is None:
+            self._sbuf = bytearray(STATIC_CHUNK)
+        return self._sbuf
+
+    async def _send_page(self, w, method, headers, keep):
+        """Страница портала: gzip как есть с диска, кусками по STATIC_CHUNK, ETag/304."""
+        # все браузеры шлют gzip; без него — несжатый файл, если он есть на flash
+        a = self._asset(b"gzip" in headers.get(b"accept-encoding", b"")) or self._asset()
+        if a is None:
+            html = self.fallback_html.replace("{path}", self.html_path).encode()
+            await self._send_200(w, b"" if method == b"HEAD" else html, keep=keep)
+            return
+        fn, gz, size, etag = a
+        conn = b"Connection: " + (b"keep-alive" if keep else b"close") + b"\r\n"
+        if headers.get(b"if-none-match") == etag:
+            w.write(b"HTTP/1.1 304 Not Modified\r\nETag: " + etag + b"\r\n" + conn + b"\r\n")
+            await w.drain()
+            return
+        w.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/html; charset=utf-8\r\n"
+            + (b"Content-Encoding: gzip\r\nVary: Accept-Encoding\r\n" if gz else b"") +
+            b"Cache-Control: no-cache\r\n"
+            b"ETag: " + etag + b"\r\n"
+            + conn +
+            b"Content-Length: " + str(size).encode() + b"\r\n\r\n"
+        )
+        if method == b"HEAD":
+            await w.drain()
+            return
+        # write() копирует данные до await, поэтому буфер общий для всех соединений
+        buf = self._static_buf()
+        mv = memoryview(buf)
+        with open(fn, "rb") as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                w.write(mv[:n])
+                await w.drain()
 
     # --- send helpers ---
 
-    def _send_raw(self, conn, status=b"200 OK", body=b"", mime=b"text/html; charset=utf-8"):
-        try:
-            hdr = (
-                b"HTTP/1.1 " + status + b"\r\n"
-                b"Content-Type: " + mime + b"\r\n"
-                b"Cache-Control: no-store\r\n"
-                b"Connection: close\r\n"
-                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
-                b"\r\n"
-            )
-            conn.sendall(hdr)
-            if body and not status.startswith(b"204"):
-                conn.sendall(body)
-        except:
-            pass
+    async def _send_raw(self, w, status=b"200 OK", body=b"", mime=b"text/html; charset=utf-8", keep=False):
+        hdr = (
+            b"HTTP/1.1 " + status + b"\r\n"
+            b"Content-Type: " + mime + b"\r\n"
+            b"Cache-Control: no-store\r\n"
+            b"Connection: " + (b"keep-alive" if keep else b"close") + b"\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"\r\n"
+        )
+        w.write(hdr)
+        if body and not status.startswith(b"204"):
+            w.write(body)
+        await w.drain()
 
-    def _send_200(self, conn, body: bytes, mime=b"text/html; charset=utf-8"):
-        self._send_raw(conn, b"200 OK", body, mime)
+    async def _send_200(self, w, body: bytes, mime=b"text/html; charset=utf-8", keep=False):
+        await self._send_raw(w, b"200 OK", body, mime, keep)
 
-    def _send_json(self, conn, obj: dict):
+    async def _send_json(self, w, obj: dict, keep=False):
         try:
             body = json.dumps(obj).encode()
         except:
             body = b"{}"
-        self._send_200(conn, body, mime=b"application/json")
+        await self._send_200(w, body, b"application/json", keep)
 
-    def _send_400(self, conn, msg=b"Bad Request"):
-        self._send_raw(conn, b"400 Bad Request", msg, b"text/plain; charset=utf-8")
+    async def _send_400(self, w, msg=b"Bad Request", keep=False):
+        await self._send_raw(w, b"400 Bad Request", msg, TEXT, keep)
 
-    def _send_404(self, conn):
-        self._send_raw(conn, b"404 Not Found", b"Not Found", b"text/plain; charset=utf-8")
+    async def _send_404(self, w, keep=False):
+        await self._send_raw(w, b"404 Not Found", b"Not Found", TEXT, keep)
 
-    def _send_411(self, conn):
-        self._send_raw(conn, b"411 Length Required", b"Length Required", b"text/plain; charset=utf-8")
+    async def _send_409(self, w, obj: dict, keep=False):
+        await self._send_raw(w, b"409 Conflict", json.dumps(obj).encode(), b"application/json", keep)
+
+    async def _send_411(self, w, keep=False):
+        await self._send_raw(w, b"411 Length Required", b"Length Required", TEXT, keep)
 
     # --- request parsing ---
 
-    def _read_headers(self, conn):
-        """Читает заголовки до CRLFCRLF; возвращает (method, path, qs, headers:dict, rest_body:bytes)"""
-        try:
-            conn.settimeout(5)
-        except:
-            pass
-        buf = b""
-        head_limit = 8192
-        while b"\r\n\r\n" not in buf and len(buf) < head_limit:
-            chunk = conn.recv(1024)
-            if not chunk:
-                break
-            buf += chunk
-        head, sep, rest = buf.partition(b"\r\n\r\n")
-        if not sep:
-            return None, None, None, {}, b""
-        lines = head.split(b"\r\n")
-        req_line = lines[0] if lines else b"GET / HTTP/1.1"
-        parts = req_line.split()
+    async def _read_headers(self, r, timeout_s):
+        """Строка запроса + заголовки; (method, path, qs, version, headers) или None (закрыто/таймаут)."""
+        line = await asyncio.wait_for(r.readline(), timeout_s)
+        if not line:
+            return None
+        parts = line.split()
         method = parts[0] if len(parts) >= 1 else b"GET"
         raw_path = parts[1] if len(parts) >= 2 else b"/"
+        version = parts[2] if len(parts) >= 3 else b"HTTP/1.0"
         path, _, qs = raw_path.partition(b"?")
         headers = {}
-        for ln in lines[1:]:
+        for _ in range(MAX_HEADER_LINES):
+            ln = await asyncio.wait_for(r.readline(), HEADER_TIMEOUT_S)
+            if not ln or ln in (b"\r\n", b"\n"):
+                break
             if b":" in ln:
                 k, v = ln.split(b":", 1)
                 headers[k.strip().lower()] = v.strip()
-        return method, path, qs, headers, rest
+        return method, path, qs, version, headers
+
+    async def _read_body(self, r, total):
+        """Тело в заранее выделенный буфер через readinto, без накопления bytes."""
+        if self._chunk is None:
+            self._chunk = bytearray(CHUNK_MAX)
+        mv = memoryview(self._chunk)
+        got = 0
+        while got < total:
+            n = await _readinto(r, mv[got:total])
+            if not n:
+                return None
+            got += n
+        return mv[:total]
+
+    def _library(self):
+        if self.lib is None:
+            self.lib = ImageLibrary()
+        return self.lib
+
+    async def _reset_after(self, w):
+        # ответ уже отдан — дать стеку его отправить и перезагрузиться
+        await _close(w)
+        await asyncio.sleep(0.2)
+        machine.reset()
 
     # --- handlers ---
 
-    def _handle_post_img(self, conn, headers, rest):
-        """/img — сохранить поток PPM в app/led.ppm (потоково, без буферизации всего файла)."""
+    async def _handle_post_img(self, r, w, headers):
+        """/img — картинка одним телом (старые клиенты): потоково через буфер CHUNK_MAX
+        во временный файл, в библиотеку только если тело пришло целиком."""
         cl = headers.get(b"content-length", None)
         if not cl:
-            self._send_411(conn); return
+            await self._send_411(w); return
         try:
             total = int(cl)
         except:
-            self._send_400(conn, b"Invalid Content-Length"); return
+            await self._send_400(w, b"Invalid Content-Length"); return
 
-        out_path = "apps/led.ppm"
+        if self._chunk is None:
+            self._chunk = bytearray(CHUNK_MAX)
+        mv = memoryview(self._chunk)
         written = 0
         print('start write led')
+        with open(IMG_PART, "wb") as f:
+            while written < total:
+                n = await _readinto(r, mv[:min(CHUNK_MAX, total - written)])
+                if not n:
+                    break
+                f.write(mv[:n])
+                written += n
+        if written != total:
+            await self._send_400(w, b"Incomplete body")
+            return
+        try: os.remove(IMG_META)
+        except: pass
+        i = self._library().add(IMG_PART, "upload.p16")
+        await self._send_json(w, {"ok": True, "bytes": written, "id": i})
+        await self._reset_after(w)
+
+    # --- возобновляемая загрузка /img/* ---
+    # begin?size=N&crc=HEX[&name=] -> {"offset"}: та же картинка (size+crc) — продолжаем с места обрыва
+    # chunk?offset=O&crc=HEX -> {"offset"}: тело до CHUNK_MAX, пишется только при совпадении CRC
+    # status                 -> {"size", "offset"}
+    # commit                 -> проверка CRC всего файла, в библиотеку (выбрана) -> {"id"}
+
+    def _upload_meta(self):
         try:
-            os.remove(out_path)
-        except:pass
-        if 1:
-            with open(out_path, "wb") as f:
-                if rest:
-                    f.write(rest)
-                    written += len(rest)
-                # дочитываем тело по кускам
-                while written < total:
-                    chunk = conn.recv(min(1024, total - written))
-                    
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    written += len(chunk)
-            if written != total:
-                self._send_400(conn, b"Incomplete body")
-                return
-            else:
-                machine.reset()
-        #except:
-        #    self._send_400(conn, b"Write error")
-        #    return
+            with open(IMG_META) as f:
+                return json.load(f)
+        except:
+            return None
 
-        self._send_json(conn, {"ok": True, "bytes": written})
-        
-        
+    def _part_size(self):
+        try:
+            return os.stat(IMG_PART)[6]
+        except:
+            return 0
 
-    def _handle_post_settings(self, conn, headers, rest):
+    async def _handle_img_begin(self, w, q, keep):
+        try:
+            size = int(q[b"size"])
+            crc = q[b"crc"].decode().lower()
+        except:
+            await self._send_400(w, b"size and crc required", keep); return
+        name = _unquote(q.get(b"name", b""))[:48] or None
+        meta = self._upload_meta()
+        if not (meta and meta.get("size") == size and meta.get("crc") == crc):
+            try: os.remove(IMG_PART)
+            except: pass
+            open(IMG_PART, "wb").close()
+        _ensure_dir(IMG_META)
+        with open(IMG_META, "w") as f:
+            json.dump({"size": size, "crc": crc, "name": name}, f)
+        await self._send_json(w, {"offset": self._part_size()}, keep)
+
+    async def _handle_img_chunk(self, r, w, q, headers, keep):
+        """Возвращает keep соединения: тело не прочитано — False, иначе поток не разобрать."""
+        meta = self._upload_meta()
+        try:
+            offset = int(q[b"offset"])
+            crc = int(q[b"crc"], 16)
+            total = int(headers[b"content-length"])
+        except:
+            await self._send_400(w, b"offset, crc and Content-Length required"); return False
+        have = self._part_size()
+        if meta is None or offset != have or total > CHUNK_MAX or offset + total > meta["size"]:
+            # клиент сверяется со смещением из ответа и продолжает с него; тело не читали — закрываем
+            await self._send_409(w, {"offset": have}); return False
+        body = await self._read_body(r, total)
+        if body is None:
+            await self._send_409(w, {"offset": have, "error": "crc"}); return False
+        if (binascii.crc32(body) & 0xFFFFFFFF) != crc:
+            await self._send_409(w, {"offset": have, "error": "crc"}, keep); return keep
+        with open(IMG_PART, "ab") as f:
+            f.write(body)
+        await self._send_json(w, {"offset": have + total}, keep)
+        return keep
+
+    async def _handle_img_status(self, w, keep):
+        meta = self._upload_meta() or {}
+        await self._send_json(w, {"size": meta.get("size", 0), "offset": self._part_size()}, keep)
+
+    async def _handle_img_commit(self, w, keep):
+        meta = self._upload_meta()
+        if meta is None or self._part_size() != meta["size"]:
+            await self._send_409(w, {"offset": self._part_size()}, keep); return
+        if self._chunk is None:
+            self._chunk = bytearray(CHUNK_MAX)
+        if _file_crc(IMG_PART, self._chunk) != meta["crc"]:
+            # файл испорчен — начинать заново
+            try: os.remove(IMG_PART)
+            except: pass
+            try: os.remove(IMG_META)
+            except: pass
+            await self._send_409(w, {"offset": 0, "error": "crc"}, keep); return
+        # без перезагрузки: можно сразу грузить следующую картинку
+        i = self._library().add(IMG_PART, meta.get("name"), meta["crc"])
+        try: os.remove(IMG_META)
+        except: pass
+        await self._send_json(w, {"ok": True, "bytes": meta["size"], "id": i}, keep)
+
+    # --- библиотека /lib ---
+    # GET /lib -> index.json; POST /lib/select?id=N, /lib/delete?id=N, /lib/playlist?ids=1,2,3
+
+    async def _handle_lib(self, w, path, q, keep):
+        lib = self._library()
+        try:
+            if path == b"/lib/select":
+                ok = lib.select(int(q[b"id"]))
+            elif path == b"/lib/delete":
+                ok = lib.remove(int(q[b"id"]))
+            elif path == b"/lib/playlist":
+                ids = q.get(b"ids", b"")
+                lib.set_playlist([int(x) for x in ids.split(b",") if x])
+                ok = True
+            else:
+                await self._send_404(w, keep); return
+        except (KeyError, ValueError):
+            await self._send_400(w, b"id required", keep); return
+        if not ok:
+            await self._send_404(w, keep); return
+        await self._send_json(w, lib.idx, keep)
+
+    async def _handle_post_settings(self, r, w, headers):
         """/settings — принять JSON и сохранить в apps/led_settings.json"""
-        cl = headers.get(b"content-length", b"0")
         try:
-            total = int(cl)
+            total = int(headers.get(b"content-length", b"0"))
         except:
             total = 0
-        body = rest or b""
-        while len(body) < total:
-            chunk = conn.recv(min(512, total - len(body)))
-            if not chunk:
-                break
-            body += chunk
+        body = await self._read_body(r, min(total, CHUNK_MAX)) if total else b""
         try:
-            data = json.loads(body or b"{}")
+            data = json.loads(bytes(body or b"{}"))
         except:
-            self._send_400(conn, b"Invalid JSON"); return
+            await self._send_400(w, b"Invalid JSON"); return
 
         cfg = {
             "pxCount": max(1, int(data.get("pxCount", 64))),
             "canonMode": bool(data.get("canonMode", False)),
             "startPause": max(0, int(data.get("startPause", 0))),
+            "baked": bool(data.get("baked", True)),
         }
         try:
             out_path = "apps/led_settings.json"
@@ -255,98 +510,135 @@ class _HTTPServer:
             with open(out_path, "w") as f:
                 f.write(json.dumps(cfg))
         except:
-            self._send_400(conn, b"Settings write error"); return
+            await self._send_400(w, b"Settings write error"); return
 
-        self._send_json(conn, {"ok": True})
-        machine.reset()
+        await self._send_json(w, {"ok": True})
+        await self._reset_after(w)
 
-    def _handle_get_settings(self, conn):
+    async def _handle_get_settings(self, w, keep):
         """Необязательно: GET /settings — вернуть текущие настройки (удобно для отладки)."""
         try:
             with open("apps/led_settings.json", "r") as f:
                 cfg = json.loads(f.read() or "{}")
         except:
-            cfg = {"pxCount": 64, "canonMode": False, "startPause": 0}
-        self._send_json(conn, cfg)
+            cfg = {"pxCount": 64, "canonMode": False, "startPause": 0, "baked": True}
+        await self._send_json(w, cfg, keep)
 
     # --- connection ---
 
-    def _handle_conn(self, conn):
-        try:
-            method, path, qs, headers, rest = self._read_headers(conn)
-            if method is None:
-                self._send_400(conn, b"Bad request")
-                return
-
-            # captive paths
-            if path in self.CAPTIVE_PATHS:
-                if method == b"HEAD":
-                    self._send_raw(conn, b"200 OK", b"")
-                else:
-                    self._send_200(conn, self._read_file())
-                return
-
-            if path == b"/img" and method == b"POST":
-                self._handle_post_img(conn, headers, rest)
-                return
-
-            if path == b"/settings":
-                if method == b"POST":
-                    self._handle_post_settings(conn, headers, rest)
-                    return
-                elif method in (b"GET", b"HEAD"):
-                    # опционально — можно убрать при желании
-                    self._handle_get_settings(conn)
-                    return
-
-            # default: отдать страницу
-            if method == b"HEAD":
-                self._send_raw(conn, b"200 OK", b"")
-            else:
-                self._send_200(conn, self._read_file())
-
-        finally:
+    async def _dispatch(self, r, w, method, path, qs, headers, keep):
+        """Обработать один запрос; возвращает, можно ли читать следующий из соединения.
+        Обработчики, что не читают тело или перезагружают устройство, отвечают с Connection: close."""
+        if path == b"/img/chunk" and method == b"POST":
+            # тело читает сам обработчик, он же решает keep
+            async with self._upload:
+                return await self._handle_img_chunk(r, w, _parse_qs(qs), headers, keep)
+        if headers.get(b"content-length", b"0") not in (b"0", b"") or b"transfer-encoding" in headers:
+            keep = False                  # тело дальше не читаем — поток не разобрать
+
+        # captive paths
+        if path in self.CAPTIVE_PATHS:
+            await self._send_page(w, method, headers, keep)
+            return keep
+
+        if path == b"/img" and method == b"POST":
+            async with self._upload:
+                await self._handle_post_img(r, w, headers)
+            return False
+
+        if path.startswith(b"/img/"):
+            q = _parse_qs(qs)
+            async with self._upload:
+                if path == b"/img/begin" and method == b"POST":
+                    await self._handle_img_begin(w, q, keep)
+                    return keep
+                if path == b"/img/status":
+                    await self._handle_img_status(w, keep)
+                    return keep
+                if path == b"/img/commit" and method == b"POST":
+                    await self._handle_img_commit(w, keep)
+                    return keep
+            await self._send_404(w)
+            return False
+
+        if path == b"/lib":
+            await self._send_json(w, self._library().idx, keep)
+            return keep
+        if path.startswith(b"/lib/") and method == b"POST":
+            await self._handle_lib(w, path, _parse_qs(qs), keep)
+            return keep
+
+        if path == b"/settings":
+            if method == b"POST":
+                async with self._upload:
+                    await self._handle_post_settings(r, w, headers)
+                return False
+            elif method in (b"GET", b"HEAD"):
+                # опционально — можно убрать при желании
+                await self._handle_get_settings(w, keep)
+                return keep
+
+        # default: отдать страницу
+        await self._send_page(w, method, headers, keep)
+        return keep
+
+    async def _client(self, r, w):
+        # только что закрытое соединение освобождает слот чуть позже, чем клиент переподключится
+        for _ in range(SLOT_WAIT_TRIES):
+            if self.active < MAX_CLIENTS:
+                break
+            await asyncio.sleep(0.05)
+        if self.active >= MAX_CLIENTS:
+            self.rejected += 1
             try:
-                conn.close()
+                await self._send_raw(w, b"503 Service Unavailable", b"Busy", TEXT)
             except:
                 pass
+            await _close(w)
+            return
+        self.active += 1
+        try:
+            for n in range(MAX_REQUESTS):
+                req = await self._read_headers(r, KEEPALIVE_S if n else HEADER_TIMEOUT_S)
+                if req is None:
+                    break
+                method, path, qs, version, headers = req
+                conn_hdr = headers.get(b"connection", b"").lower()
+                keep = (conn_hdr == b"keep-alive") if version == b"HTTP/1.0" else (conn_hdr != b"close")
+                keep = keep and n < MAX_REQUESTS - 1
+                self.served += 1
+                if not await self._dispatch(r, w, method, path, qs, headers, keep):
+                    break
+        except Exception as e:
+            # таймаут простоя/заголовков, обрыв клиента
+            if not isinstance(e, (asyncio.TimeoutError, OSError)):
+                print("http client error:", e)
+        finally:
+            self.active -= 1
+            await _close(w)
 
     # --- lifecycle ---
 
-    def start(self):
-        if self.sock:
+    async def start(self):
+        if self.server:
             return
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        try:
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        except:
-            pass
-        s.bind(("0.0.0.0", self.port))
-        s.listen(8)
-        s.setblocking(False)
-        self.sock = s
+        self.server = await asyncio.start_server(self._client, "0.0.0.0", self.port, backlog=8)
 
     def stop(self):
-        try:
-            if self.sock:
-                self.sock.close()
-        finally:
-            self.sock = None
-
-    def poll(self):
-        if not self.sock:
-            return
-        try:
-            conn, addr = self.sock.accept()
-        except:
-            return
-        self._handle_conn(conn)
+        if self.server:
+            try:
+                self.server.close()
+            except:
+                pass
+            self.server = None
 
 # --------------------------- Facade ---------------------------
 
+PUMP_MS = 15                      # сколько poll() крутит asyncio при активных клиентах
+
 class CaptivePortal:
     def __init__(self, ssid="Camera-Setup", ip="192.168.4.1", mask="255.255.255.0",
-                 gw="192.168.4.1", html_path="apps/settings.html",app=None):
+                 gw="192.168.4.1", html_path="apps/settings.html",app=None,lib=None):
         self.ap = network.WLAN(network.AP_IF)
         self.ap.active(True)
         self.ssid = ssid
@@ -356,9 +648,11 @@ class CaptivePortal:
         self.html_path = html_path
 
         self.dns = _DNSServer(ip=ip, port=53)
-        self.http = _HTTPServer(ip=ip, port=80, html_path=html_path)
+        self.http = _HTTPServer(ip=ip, port=80, html_path=html_path, lib=lib)
 
         self._running = False
+        self._loop = None
+        self._dns_task = None
 
     def _setup_ap(self):
         self.ap.active(True)
@@ -379,33 +673,61 @@ class CaptivePortal:
         print("AP started:", self.ap.config("essid"), self.ap.ifconfig())
 
     def start(self, run_forever=True):
+        """run_forever — крутить asyncio-цикл здесь; иначе цикл прокачивается из poll()
+        (главный цикл приложения синхронный и зовёт poll через loop_callback)."""
         if self._running:
             return
         self._setup_ap()
         self.dns.start()
-        self.http.start()
         self._running = True
         print("CaptivePortal ready on http://%s/  (file: %s)" % (self.ip, self.html_path))
 
         if run_forever:
             try:
-                while self._running:
-                    self.poll()
-                    time.sleep_ms(5)
+                asyncio.run(self._serve_forever())
             except KeyboardInterrupt:
                 print("Stopping by KeyboardInterrupt")
-                self.stop()
+            self.stop()
+            return
+        self._loop = asyncio.get_event_loop()
+        self._loop.run_until_complete(self.http.start())
+        self._dns_task = self._loop.create_task(self.dns.serve())
+
+    async def _serve_forever(self):
+        await self.http.start()
+        self._dns_task = asyncio.create_task(self.dns.serve())
+        while self._running:
+            await asyncio.sleep(0.1)
+
+    async def _pump(self):
+        # хотя бы один проход планировщика; пока есть клиенты — до PUMP_MS подряд
+        t0 = time.ticks_ms()
+        await asyncio.sleep(0)
+        while self.http.active and time.ticks_diff(time.ticks_ms(), t0) < PUMP_MS:
+            await asyncio.sleep(0.001)
 
     def poll(self):
-        if not self._running:
+        if not self._running or self._loop is None:
             return
-        self.dns.poll()
-        self.http.poll()
+        self._loop.run_until_complete(self._pump())
 
     def stop(self):
         self._running = False
-        self.dns.stop()
         self.http.stop()
+        self.dns.stop()           # serve() выйдет сам: сокета больше нет
+        if self._dns_task:
+            try:
+                self._dns_task.cancel()
+            except:
+                pass
+            self._dns_task = None
+        if self._loop is not None:
+            # брошенные задачи клиентов не должны проснуться при следующем запуске портала
+            try:
+                asyncio.new_event_loop()
+            except:
+                pass
+        self._loop = None
         try:
             if self.ap:
                 self.ap.active(False)
@@ -425,6 +747,7 @@ class App:
     def start(self, app):
         self.app = app
         self.last_time=0
+        self.last_stats=None
         self.portal_running=False
 
         self.set_mode=0
@@ -436,7 +759,7 @@ class App:
         except:
             self.wait_ms=0
             self.lightness=100
-        
+        self.lib=ImageLibrary()
         
 
         
@@ -456,41 +779,26 @@ class App:
         self.preview_led()
         
         
-    def preview_led(self, scale=2):
+    def preview_led(self):
+        # превью лежит в хвосте файла картинки (собрано при загрузке)
+        Lcd.fillRect(0, PREVIEW_Y, 135, PREVIEW_MAX_H, 0x000000)
         try:
-            with P16Reader("apps/led.ppm", order="RGB", level=100) as r:
-                w = min(r.width, 135 * scale)   # учитываем масштабирование
-                h = min(r.height, (240-31) * scale)
-                y0 = 31                         # смещение вниз (под заголовок)
-
-                for y in range(h):
-                    row = r.load_next()
-                    if row is None:
-                        break
-                    if y % scale:                # пропускаем лишние строки
-                        continue
-
-                    for x in range(w):
-                        if x % scale:            # пропускаем лишние колонки
-                            continue
-
-                        i = 3 * x
-                        R = row[i]
-                        G = row[i+1]
-                        B = row[i+2]
-                        color = (R << 16) | (G << 8) | B   # RGB888
-
-                    # Поворот + уменьшение
-                        Display.drawPixel(y // scale, y0 + (w // scale - 1 - x // scale), color)
+            t0 = time.ticks_ms()
+            t = self.lib.thumb(self.lib.current())
+            if t is None:
+                return
+            tw, th, buf = t
+            Lcd.drawRawBuf(buf, 0, PREVIEW_Y, tw, th, len(buf), True)
+            print("preview %dx%d: %d ms" % (tw, th, time.ticks_diff(time.ticks_ms(), t0)))
         except Exception as e:
             print("preview error:", e)
-   
+
     def start_portal(self):
         if self.portal_running:
             self.stop()
             return
         self.app.ble.active(False)
-        self.portal = CaptivePortal(ssid="FrzLight "+self.app.config['name'], html_path="apps/freezlight.html",app=self)
+        self.portal = CaptivePortal(ssid="FrzLight "+self.app.config['name'], html_path="apps/freezlight.html",app=self,lib=self.lib)
         self.portal_running=True
         self.draw()
 
@@ -499,10 +807,25 @@ class App:
    
     def change_mode(self):
         self.set_mode+=1
-        if self.set_mode>1:self.set_mode=0
+        if self.set_mode>2:self.set_mode=0
+        self.draw()
+
+    def pick_image(self,d):
+        # по кругу: картинки библиотеки, затем "плейлист" (если он задан в портале)
+        ids=[it['id'] for it in self.lib.items]
+        if self.lib.idx['playlist']:ids.append(None)
+        if not ids:return
+        cur=None if self.lib.idx['play'] else self.lib.idx['sel']
+        k=(ids.index(cur)+d)%len(ids) if cur in ids else 0
+        if ids[k] is None:self.lib.play(True)
+        else:self.lib.select(ids[k])
+        self.preview_led()
         self.draw()
     
     def plus(self):
+        if self.set_mode==2:
+            self.pick_image(1)
+            return
         if self.set_mode==0:
             self.wait_ms+=1
             if self.wait_ms>100:self.wait_ms=100
@@ -515,6 +838,9 @@ class App:
             f.write(json.dumps({'wait_ms':self.wait_ms,'lightness':self.lightness}))
         
     def minus(self):
+        if self.set_mode==2:
+            self.pick_image(-1)
+            return
         if self.set_mode==0:
             self.wait_ms-=1
             if self.wait_ms<0:self.wait_ms=0
@@ -545,9 +871,9 @@ class App:
             y = 60+10
             Lcd.drawString("FrzLight " + self.app.config['name'], x, y)
         
-        Lcd.drawRect(5, 98+20 if self.set_mode==0 else 118+20, 125, 16, 0xFFFFFF)
+        Lcd.drawRect(5, 118+20*self.set_mode, 125, 16, 0xFFFFFF)
         
-        txt="Delay "+str(self.wait_ms)+" ms."
+        txt="Row "+str(self.wait_ms)+" ms." if self.wait_ms else "Row: max speed"
         w = Lcd.textWidth(txt)
         x = (125 - w) // 2 + 5
         y = 100+20
@@ -558,6 +884,19 @@ class App:
         x = (125 - w) // 2 + 5
         y = 120+20
         Lcd.drawString(txt,x,y)
+
+        idx=self.lib.idx
+        if idx['play'] and idx['playlist']:
+            txt="Playlist %d/%d" % (idx['pos']+1,len(idx['playlist']))
+        elif self.lib.current():
+            ids=[it['id'] for it in self.lib.items]
+            txt="Image %d/%d" % (ids.index(idx['sel'])+1,len(ids))
+        else:
+            txt="No images"
+        w = Lcd.textWidth(txt)
+        x = (125 - w) // 2 + 5
+        y = 140+20
+        Lcd.drawString(txt,x,y)
         
 
         txt="Last time"
@@ -572,6 +911,14 @@ class App:
         x = (125 - w) // 2 + 5
         y = 180+20
         Lcd.drawString(txt,x,y)
+        if self.last_stats and self.last_stats.n:
+            # период строки min/avg/max, мс
+            st=self.last_stats
+            Lcd.setFont(Widgets.FONTS.DejaVu12)
+            txt="%d.%d/%d.%d/%d.%d ms" % (st.min//1000,st.min%1000//100,st.avg()//1000,st.avg()%1000//100,st.max//1000,st.max%1000//100)
+            w = Lcd.textWidth(txt)
+            x = (125 - w) // 2 + 5
+            Lcd.drawString(txt,x,226)
         print('Free mem',gc.mem_free())
         
 
@@ -583,10 +930,15 @@ class App:
         if self.portal_running:
             self.stop()
             return
+        it=self.lib.current()
+        if it is None:
+            self.app.play_tone(220,300)
+            return
+        src=self.lib.path(it['id'])
         try:
             sets=json.loads(open('apps/led_settings.json').read())
         except:
-            sets={"startPause": 0, "pxCount": 144, "canonMode": true}
+            sets={"startPause": 0, "pxCount": 144, "canonMode": True}
             
             
         np = NeoPixel(machine.Pin(26), sets['pxCount'])
@@ -597,6 +949,21 @@ class App:
                 
                 time.sleep_ms(750)
 
+        # запечь заранее (до паузы и снимка), чтобы на проходе только readinto -> np.write
+        reader=None
+        if sets.get('baked',True):
+            try:
+                baked=self.lib.baked(it['id'])
+                if not BakedReader.is_fresh(baked,src,self.lightness,it['crc']):
+                    t_bake=time.ticks_ms()
+                    bake_p16(src,baked,self.lightness,tag=it['crc'])
+                    print('baked in',time.ticks_diff(time.ticks_ms(),t_bake),'ms')
+                reader=BakedReader(baked,preload=True)
+            except Exception as e:
+                print('bake error:',e)
+        if reader is None:
+            reader=P16Reader(src, level=self.lightness, order="GRB", lut=True, preload=True)
+
         if sets['canonMode']:
             self.canon=CanonRemoteBLE(ble=self.app.ble,app=self,my_name=self.app.config['name'],store='apps/canon_new.json',verbose=True)
             time.sleep_ms(100)
@@ -606,24 +973,24 @@ class App:
         self.app.play_tone(330,500)
         Widgets.setBrightness(0)
         t0=time.time()
-        with P16Reader("apps/led.ppm", level=self.lightness, order="GRB") as r:
-            print(r.width, r.height)
-            while True:
-                row=r.load_next()
-                if row is None: break
-                np.buf=row
-                np.write()
-                time.sleep_ms(self.wait_ms)
+        with reader as r:
+            print(r.width, r.height, 'RAM' if r.preloaded else 'stream')
+            stats=play_rows(r,np,self.wait_ms*1000)
         np.fill((0,0,0))
         np.write()
-                
+
         self.last_time=time.time()-t0
+        self.last_stats=stats
+        print('row period', 'baked' if isinstance(reader,BakedReader) else 'decode', stats)
         self.app.play_tone(330,50)
         time.sleep_ms(50)
         self.app.play_tone(330,50)
         time.sleep_ms(50)       
         self.app.play_tone(330,50)                   
         Widgets.setBrightness(30)
+        if self.lib.idx['play']:
+            self.lib.advance()
+            self.preview_led()
         self.draw()
 
     
@@ -643,19 +1010,109 @@ class App:
 
 
 
+LUT_BYTES = 65536 * 3     # RGB565 -> 3 байта в порядке ленты, уже с level
+LUT_RESERVE = 48 * 1024   # сколько кучи оставить после LUT (Wi-Fi/BLE/буферы)
+PRELOAD_RESERVE = 32 * 1024  # сколько кучи оставить после картинки целиком в RAM
+
+
+def _preload_rows(height, row_bytes, fill):
+    """Картинка целиком в одном bytearray (на PSRAM-сборках куча и так в PSRAM) +
+    заранее нарезанные memoryview строк — на проходе ни одной аллокации.
+    fill(mv) заполняет весь буфер. None — если не влезает."""
+    need = height * row_bytes
+    gc.collect()
+    if gc.mem_free() < need + PRELOAD_RESERVE:
+        return None
+    try:
+        img = bytearray(need)
+        mv = memoryview(img)
+        fill(mv)
+        return [mv[y * row_bytes:(y + 1) * row_bytes] for y in range(height)]
+    except MemoryError:
+        return None
+
+
+@micropython.viper
+def _row565(src, dst, w: int, t5, t6, grb: int):
+    # src: 2*w байт (RGB565 BE), dst: 3*w байт; t5/t6 — таблицы 5/6 -> 8 бит с level
+    s = ptr8(src)
+    d = ptr8(dst)
+    a5 = ptr8(t5)
+    a6 = ptr8(t6)
+    oR = 0
+    oG = 1
+    if grb:
+        oR = 1
+        oG = 0
+    n = w * 2
+    i = 0
+    j = 0
+    while i < n:
+        hi = s[i]
+        lo = s[i + 1]
+        d[j + oR] = a5[hi >> 3]
+        d[j + oG] = a6[((hi & 7) << 3) | (lo >> 5)]
+        d[j + 2] = a5[lo & 31]
+        i += 2
+        j += 3
+
+
+@micropython.viper
+def _row565_lut(src, dst, w: int, lut):
+    # одна выборка 3 байт на пиксель из 64K-таблицы
+    s = ptr8(src)
+    d = ptr8(dst)
+    t = ptr8(lut)
+    n = w * 2
+    i = 0
+    j = 0
+    while i < n:
+        k = ((s[i] << 8) | s[i + 1]) * 3
+        d[j] = t[k]
+        d[j + 1] = t[k + 1]
+        d[j + 2] = t[k + 2]
+        i += 2
+        j += 3
+
+
+@micropython.viper
+def _build_lut(lut, t5, t6, grb: int):
+    t = ptr8(lut)
+    a5 = ptr8(t5)
+    a6 = ptr8(t6)
+    oR = 0
+    oG = 1
+    if grb:
+        oR = 1
+        oG = 0
+    v = 0
+    while v < 65536:
+        k = v * 3
+        t[k + oR] = a5[v >> 11]
+        t[k + oG] = a6[(v >> 5) & 63]
+        t[k + 2] = a5[v & 31]
+        v += 1
+
+
 class P16Reader:
     """
     Формат:
       P16 <w> <h>\\n
       затем h блоков по 2*w байт (RGB565), БЕЗ '\\n' между строками.
 
-    __init__(path, order='GRB', level=100)
+    __init__(path, order='GRB', level=100, lut=False, preload=False)
       level — множитель яркости в процентах (0..100).
+      lut — построить 64K-таблицу RGB565 -> 3 байта (192 КБ), если хватает кучи;
+            иначе конвертация через таблицы 5/6 бит.
+      preload — если сконвертированная картинка (3*w*h) влезает в кучу, прочитать
+            её целиком сразу и отдавать строки из RAM (self.preloaded); иначе поток.
 
-    load_next() -> memoryview длиной 3*w (GRB или RGB), либо None при конце.
+    load_next() -> memoryview длиной 3*w (GRB или RGB), либо None при конце;
+      буферы чередуются, предыдущая строка остаётся целой до следующего вызова.
     """
 
-    def __init__(self, path: str, order: str = "GRB", level: int = 100):
+    def __init__(self, path: str, order: str = "GRB", level: int = 100, lut: bool = False,
+                 preload: bool = False):
         if order not in ("GRB", "RGB"):
             raise ValueError("order must be 'GRB' or 'RGB'")
         self._order_grb = (order == "GRB")
@@ -682,6 +1139,9 @@ class P16Reader:
         self._row_out_bytes = 3 * self.width
         self._row_in  = bytearray(self._row_in_bytes)
         self._row_out = bytearray(self._row_out_bytes)
+        # два выходных буфера по очереди: строка на ленте не портится подкачкой следующей
+        self._outs = (memoryview(self._row_out), memoryview(bytearray(self._row_out_bytes)))
+        self._k = 0
 
         # Базовые таблицы расширения до 8 бит
         base5 = [(v << 3) | (v >> 2) for v in range(32)]   # 5 -> 8
@@ -699,6 +1159,20 @@ class P16Reader:
             self._t5 = bytes(((x * L + 50) // 100) & 0xFF for x in base5)
             self._t6 = bytes(((x * L + 50) // 100) & 0xFF for x in base6)
 
+        self._lut = None
+        self._rows = None
+        if preload:
+            self._rows = _preload_rows(self.height, self._row_out_bytes, self._convert_all)
+        self.preloaded = self._rows is not None
+        if lut and not self.preloaded:
+            gc.collect()
+            if gc.mem_free() > LUT_BYTES + LUT_RESERVE:
+                try:
+                    self._lut = bytearray(LUT_BYTES)
+                    _build_lut(self._lut, self._t5, self._t6, self._order_grb)
+                except MemoryError:
+                    self._lut = None
+
         self.row_index = 0
 
     # --- utils ---
@@ -726,9 +1200,16 @@ class P16Reader:
                 m = len(chunk)
             got += m
 
-    # --- fast converter ---
-    @micropython.native
+    # --- converters ---
     def _convert_row(self, src_mv, dst_mv, w, t5, t6, order_grb):
+        if self._lut is not None:
+            _row565_lut(src_mv, dst_mv, w, self._lut)
+        else:
+            _row565(src_mv, dst_mv, w, t5, t6, order_grb)
+
+    @micropython.native
+    def _convert_row_native(self, src_mv, dst_mv, w, t5, t6, order_grb):
+        # прежний вариант (native, поштучная индексация) — для bench_convert()
         # src: 2*w байт (RGB565), dst: 3*w байт
         s = src_mv; d = dst_mv
         _t5 = t5; _t6 = t6
@@ -750,13 +1231,25 @@ class P16Reader:
                 d[j]   = R; d[j+1] = G; d[j+2] = B
             j += 3
 
+    def _convert_all(self, dst):
+        mv_in = memoryview(self._row_in)
+        n = self._row_out_bytes
+        for y in range(self.height):
+            self._readinto_exact(self._f, mv_in, self._row_in_bytes)
+            _row565(mv_in, dst[y * n:(y + 1) * n], self.width, self._t5, self._t6, self._order_grb)
+
     # --- API ---
     def load_next(self):
         """Вернуть следующую строку (memoryview длиной 3*w) или None при конце."""
         if self.row_index >= self.height:
             return None
+        if self._rows is not None:
+            row = self._rows[self.row_index]
+            self.row_index += 1
+            return row
         mv_in  = memoryview(self._row_in)
-        mv_out = memoryview(self._row_out)
+        mv_out = self._outs[self._k]
+        self._k ^= 1
         self._readinto_exact(self._f, mv_in, self._row_in_bytes)
         self._convert_row(mv_in, mv_out, self.width, self._t5, self._t6, self._order_grb)
         self.row_index += 1
@@ -765,9 +1258,15 @@ class P16Reader:
     def seek_row(self, y: int):
         if not (0 <= y < self.height):
             raise ValueError("row out of range")
-        self._f.seek(self._data_off + y * self._row_in_bytes)
+        if self._rows is None:
+            self._f.seek(self._data_off + y * self._row_in_bytes)
         self.row_index = y
 
+    def read_raw(self, y: int, dst):
+        """Строка y как есть (RGB565 BE, 2*w байт) в dst — без конвертации и кэша."""
+        self._f.seek(self._data_off + y * self._row_in_bytes)
+        self._readinto_exact(self._f, memoryview(dst), self._row_in_bytes)
+
     def tell_row(self) -> int:
         return self.row_index
 
@@ -779,4 +1278,517 @@ class P16Reader:
     def __exit__(self, exc_type, exc, tb): self.close()
 
 
+BAKED_PATH = "apps/led.grb"      # прежние версии: один файл на все картинки
+
+
+def bake_p16(src, dst, level, order="GRB", tag=None):
+    """P16 -> готовые строки ленты (порядок и level уже применены), атомарно через tmp.
+    Заголовок хранит level, size/mtime исходника и tag (CRC из библиотеки) —
+    по ним BakedReader.is_fresh()."""
+    st = os.stat(src)
+    with P16Reader(src, order=order, level=level, lut=True) as r:
+        need = 3 * r.width * r.height
+        fs = os.statvfs("/")
+        if fs[0] * fs[3] < need + 4096:
+            raise OSError(28)             # ENOSPC — играем с декодированием
+        tmp = dst + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(("GRB %d %d %d %d %d%s\n" % (r.width, r.height, level, st[6], st[8],
+                                                 " " + tag if tag else "")).encode())
+            while True:
+                row = r.load_next()
+                if row is None:
+                    break
+                f.write(row)
+    try: os.remove(dst)
+    except: pass
+    os.rename(tmp, dst)
 
+
+class BakedReader:
+    """
+    Формат:
+      GRB <w> <h> <level> <src_size> <src_mtime> [<tag>]\\n
+      затем h строк по 3*w байт — сразу в np.buf.
+
+    load_next() читает по очереди в два буфера: строка, отданная ленте,
+    не перезаписывается чтением следующей. preload — как у P16Reader.
+    """
+
+    def __init__(self, path: str, preload: bool = False):
+        self._f = open(path, "rb")
+        parts = P16Reader._readline_exact(self._f).split()
+        if len(parts) not in (6, 7) or parts[0] != b"GRB":
+            self._f.close()
+            raise ValueError("Bad GRB header")
+        self.width = int(parts[1])
+        self.height = int(parts[2])
+        self._data_off = self._f.tell()
+        self._row_bytes = 3 * self.width
+        self._bufs = (bytearray(self._row_bytes), bytearray(self._row_bytes))
+        self._mvs = (memoryview(self._bufs[0]), memoryview(self._bufs[1]))
+        self._k = 0
+        self.row_index = 0
+        self._rows = None
+        if preload:
+            self._rows = _preload_rows(self.height, self._row_bytes,
+                                       lambda mv: P16Reader._readinto_exact(self._f, mv, len(mv)))
+        self.preloaded = self._rows is not None
+
+    @staticmethod
+    def is_fresh(path, src, level, tag=None):
+        """Запечённый файл есть и собран из текущего src (и tag, если задан) с тем же level."""
+        try:
+            st = os.stat(src)
+            with open(path, "rb") as f:
+                parts = P16Reader._readline_exact(f).split()
+            return (len(parts) == (7 if tag else 6) and parts[0] == b"GRB" and int(parts[3]) == level
+                    and int(parts[4]) == st[6] and int(parts[5]) == st[8]
+                    and (not tag or parts[6].decode() == tag))
+        except:
+            return False
+
+    def load_next(self):
+        if self.row_index >= self.height:
+            return None
+        if self._rows is not None:
+            row = self._rows[self.row_index]
+            self.row_index += 1
+            return row
+        mv = self._mvs[self._k]
+        self._k ^= 1
+        P16Reader._readinto_exact(self._f, mv, self._row_bytes)
+        self.row_index += 1
+        return mv
+
+    def seek_row(self, y: int):
+        if not (0 <= y < self.height):
+            raise ValueError("row out of range")
+        if self._rows is None:
+            self._f.seek(self._data_off + y * self._row_bytes)
+        self.row_index = y
+
+    def close(self):
+        try: self._f.close()
+        except: pass
+
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): self.close()
+
+
+PREVIEW_Y = 31                    # превью под заголовком
+PREVIEW_MAX_W = 135
+PREVIEW_MAX_H = 72                # до меню (draw() чистит экран с 31+72)
+THUMB_SCALE = 2
+
+
+@micropython.viper
+def _thumb_col(src, dst, n: int, step: int, off: int, stride: int):
+    # src: строка P16 (RGB565 BE); каждый step-й пиксель -> столбец экрана снизу вверх:
+    # пиксель k -> dst[off + (n-1-k)*stride], 2 байта без перестановки
+    s = ptr8(src)
+    d = ptr8(dst)
+    st2 = step * 2
+    k = 0
+    while k < n:
+        si = k * st2
+        di = off + (n - 1 - k) * stride
+        d[di] = s[si]
+        d[di + 1] = s[si + 1]
+        k += 1
+
+
+def _thumb_dims(w, h, scale=THUMB_SCALE):
+    return min((h + scale - 1) // scale, PREVIEW_MAX_W), min(w // scale, PREVIEW_MAX_H)
+
+
+def make_thumb(src=IMG_PATH, scale=THUMB_SCALE):
+    """Превью для экрана: строка картинки -> столбец (поворот), шаг scale по обеим осям.
+    Читаются только нужные строки (read_raw по смещению), пиксели остаются RGB565 —
+    готовый буфер для одного Lcd.drawRawBuf. Возвращает (w, h, buf)."""
+    with P16Reader(src, order="RGB") as r:
+        tw, th = _thumb_dims(r.width, r.height, scale)
+        buf = bytearray(2 * tw * th)
+        row = bytearray(2 * r.width)
+        for sx in range(tw):
+            r.read_raw(sx * scale, row)
+            _thumb_col(row, buf, th, scale, 2 * sx, 2 * tw)
+    return tw, th, buf
+
+
+LIB_DIR = "apps/led"
+
+
+def _file_crc(path, buf, limit=None):
+    crc = 0
+    mv = memoryview(buf)
+    with open(path, "rb") as f:
+        left = limit
+        while left is None or left > 0:
+            n = f.readinto(buf if left is None or left >= len(buf) else mv[:left])
+            if not n:
+                break
+            crc = binascii.crc32(mv[:n], crc)
+            if left is not None:
+                left -= n
+    return "%08x" % (crc & 0xFFFFFFFF)
+
+
+class ImageLibrary:
+    """
+    Картинки на устройстве: apps/led/<id>.p16 — P16, сразу за пикселями превью
+    (RGB565, make_thumb), P16Reader хвост не читает. Меню и порталу хватает
+    index.json, файлы картинок не открываются:
+      {"next": id, "sel": id, "play": bool, "playlist": [id, ...], "pos": i,
+       "items": [{"id", "name", "w", "h", "size", "crc", "thumb", "tw", "th"}, ...]}
+    size — байт P16 без превью, thumb — смещение превью (0 — нет).
+    play — снимки идут по playlist, pos — следующий.
+    apps/led/<id>.grb — запечённая картинка (bake_p16); хранятся только для
+    картинок плейлиста или выбранной, остальные удаляет prune_baked().
+    """
+
+    def __init__(self, root=LIB_DIR):
+        self.root = root
+        self.index_path = root + "/index.json"
+        try:
+            with open(self.index_path) as f:
+                self.idx = json.load(f)
+        except:
+            self.rebuild()
+        if not self.idx["items"]:
+            self._migrate()
+
+    # --- index ---
+
+    def save(self):
+        _ensure_dir(self.index_path)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.idx, f)
+        try: os.remove(self.index_path)
+        except: pass
+        os.rename(tmp, self.index_path)
+
+    def rebuild(self):
+        """Индекс потерян — собрать заново из файлов (единственное место, где их открываем)."""
+        self.idx = {"next": 1, "sel": None, "play": False, "playlist": [], "pos": 0, "items": []}
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            return
+        buf = bytearray(1024)
+        for fn in names:
+            if not fn.endswith(".p16"):
+                continue
+            try:
+                i = int(fn[:-4])
+                path = self.path(i)
+                with P16Reader(path) as r:
+                    w, h, off = r.width, r.height, r._data_off
+                size = off + 2 * w * h
+                tw, th = _thumb_dims(w, h)
+                if os.stat(path)[6] != size + 2 * tw * th:
+                    tw = th = 0
+                self.idx["items"].append({"id": i, "name": fn, "w": w, "h": h, "size": size,
+                                          "crc": _file_crc(path, buf, size),
+                                          "thumb": size if tw else 0, "tw": tw, "th": th})
+                self.idx["next"] = max(self.idx["next"], i + 1)
+            except Exception as e:
+                print("library skip", fn, e)
+        if self.idx["items"]:
+            self.idx["sel"] = self.idx["items"][-1]["id"]
+            self.save()
+
+    def _migrate(self):
+        # единственная картинка прежних версий (apps/led.ppm) -> первая в библиотеке
+        try:
+            os.stat(IMG_PATH)
+        except OSError:
+            return
+        try:
+            self.add(IMG_PATH, "led.ppm")
+        except Exception as e:
+            print("library migrate error:", e)
+
+    # --- lookup ---
+
+    @property
+    def items(self):
+        return self.idx["items"]
+
+    def path(self, i):
+        return "%s/%d.p16" % (self.root, i)
+
+    def baked(self, i):
+        return "%s/%d.grb" % (self.root, i)
+
+    def get(self, i):
+        for it in self.idx["items"]:
+            if it["id"] == i:
+                return it
+        return None
+
+    def current(self):
+        """Картинка для следующего снимка: из плейлиста или выбранная; None — пусто."""
+        pl = self.idx["playlist"]
+        if self.idx["play"] and pl:
+            return self.get(pl[self.idx["pos"] % len(pl)])
+        return self.get(self.idx["sel"])
+
+    def thumb(self, it):
+        """(w, h, buf) превью из хвоста файла картинки или None."""
+        if not it or not it["thumb"]:
+            return None
+        buf = bytearray(2 * it["tw"] * it["th"])
+        with open(self.path(it["id"]), "rb") as f:
+            f.seek(it["thumb"])
+            P16Reader._readinto_exact(f, memoryview(buf), len(buf))
+        return it["tw"], it["th"], buf
+
+    # --- changes ---
+
+    def add(self, src, name=None, crc=None):
+        """Перенести готовый P16 (rename) в библиотеку, дописать превью, выбрать. -> id."""
+        # заголовок проверяем до rename: битый файл не должен осиротеть в LIB_DIR
+        with P16Reader(src) as r:
+            w, h = r.width, r.height
+        i = self.idx["next"]
+        path = self.path(i)
+        _ensure_dir(path)
+        os.rename(src, path)
+        size = os.stat(path)[6]
+        if crc is None:
+            crc = _file_crc(path, bytearray(1024))
+        it = {"id": i, "name": name or ("%d.p16" % i), "w": w, "h": h, "size": size,
+              "crc": crc, "thumb": 0, "tw": 0, "th": 0}
+        try:
+            tw, th, buf = make_thumb(path)
+            with open(path, "ab") as f:
+                f.write(buf)
+            it.update(thumb=size, tw=tw, th=th)
+        except Exception as e:
+            print("thumb error:", e)
+        self.idx["items"].append(it)
+        self.idx["next"] = i + 1
+        self.idx["sel"] = i
+        self.idx["play"] = False
+        self.save()
+        self._changed()
+        return i
+
+    def remove(self, i):
+        if self.get(i) is None:
+            return False
+        for fn in (self.path(i), self.baked(i)):
+            try: os.remove(fn)
+            except: pass
+        self.idx["items"] = [it for it in self.idx["items"] if it["id"] != i]
+        self.idx["playlist"] = [p for p in self.idx["playlist"] if p != i]
+        if self.idx["sel"] == i:
+            self.idx["sel"] = self.idx["items"][-1]["id"] if self.idx["items"] else None
+        self._fix_pos()
+        self.save()
+        self._changed()
+        return True
+
+    def select(self, i):
+        if self.get(i) is None:
+            return False
+        self.idx["sel"] = i
+        self.idx["play"] = False
+        self.save()
+        self._changed()
+        return True
+
+    def set_playlist(self, ids):
+        self.idx["playlist"] = [i for i in ids if self.get(i) is not None]
+        self.idx["pos"] = 0
+        self.idx["play"] = bool(self.idx["playlist"])
+        self.save()
+        self._changed()
+
+    def play(self, on=True):
+        self.idx["play"] = bool(on and self.idx["playlist"])
+        self.save()
+        self._changed()
+
+    def advance(self):
+        """После снимка по плейлисту — следующая картинка (по кругу)."""
+        if not (self.idx["play"] and self.idx["playlist"]):
+            return
+        self.idx["pos"] += 1
+        self._fix_pos()
+        self.save()
+
+    def _fix_pos(self):
+        n = len(self.idx["playlist"])
+        self.idx["pos"] = self.idx["pos"] % n if n else 0
+        if not n:
+            self.idx["play"] = False
+
+    def _changed(self):
+        self.prune_baked()
+
+    def prune_baked(self):
+        """Удалить запечённые файлы картинок вне плейлиста/выбора — место на flash."""
+        keep = ["%d.grb" % i for i in (self.idx["playlist"] if self.idx["play"] else [self.idx["sel"]])
+                if i is not None]
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        for fn in names:
+            if fn.endswith(".grb") and fn not in keep:
+                try: os.remove(self.root + "/" + fn)
+                except: pass
+        try: os.remove(BAKED_PATH)
+        except: pass
+
+
+def _preview_pixels(path=IMG_PATH, scale=2):
+    # прежнее превью (drawPixel на каждый пиксель, декодирование всех строк) — для bench_preview()
+    with P16Reader(path, order="RGB", level=100) as r:
+        w = min(r.width, 135 * scale)
+        h = min(r.height, (240-31) * scale)
+        for y in range(h):
+            row = r.load_next()
+            if row is None:
+                break
+            if y % scale:
+                continue
+            for x in range(w):
+                if x % scale:
+                    continue
+                i = 3 * x
+                color = (row[i] << 16) | (row[i+1] << 8) | row[i+2]
+                Display.drawPixel(y // scale, PREVIEW_Y + (w // scale - 1 - x // scale), color)
+
+
+def _wait_until_us(deadline):
+    # грубо спим, последнюю миллисекунду дожидаемся по ticks_us
+    left = time.ticks_diff(deadline, time.ticks_us())
+    if left > 2000:
+        time.sleep_ms((left - 1000) // 1000)
+    while time.ticks_diff(deadline, time.ticks_us()) > 0:
+        pass
+
+
+def play_rows(reader, np, period_us):
+    """
+    Конвейер вывода: строка N уходит на ленту, сразу же читается/конвертируется N+1,
+    и следующий np.write() ждёт дедлайна ticks_us (period_us от предыдущего), а не
+    sleep_ms после переменной работы. Чтение flash прячется внутри периода; если
+    работа длиннее периода — лента идёт с максимальной скоростью без догоняния.
+    period_us=0 — без ожидания. Возвращает RowStats периода между np.write().
+    """
+    stats = RowStats()
+    row = reader.load_next()
+    if row is None:
+        return stats
+    gc.collect()                  # сборка мусора посреди прохода даёт полосу
+    t_prev = None
+    deadline = time.ticks_us()
+    while row is not None:
+        np.buf = row
+        t = time.ticks_us()
+        np.write()
+        if t_prev is not None:
+            stats.add(time.ticks_diff(t, t_prev))
+        t_prev = t
+        row = reader.load_next()  # prefetch N+1, буфер строки N не трогается
+        if period_us and row is not None:
+            deadline = time.ticks_add(deadline, period_us)
+            if time.ticks_diff(time.ticks_us(), deadline) > period_us:
+                deadline = time.ticks_us()    # сильно опоздали — не выстреливаем пачкой
+            _wait_until_us(deadline)
+    return stats
+
+
+class RowStats:
+    """Период строки (мкс): min/avg/max и джиттер (стандартное отклонение)."""
+
+    def __init__(self):
+        self.n = 0
+        self.sum = 0
+        self.sumsq = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, dt):
+        self.n += 1
+        self.sum += dt
+        self.sumsq += dt * dt
+        if self.min is None or dt < self.min:
+            self.min = dt
+        if dt > self.max:
+            self.max = dt
+
+    def avg(self):
+        return self.sum // self.n if self.n else 0
+
+    def jitter(self):
+        if not self.n:
+            return 0
+        a = self.sum / self.n
+        return int(max(0, self.sumsq / self.n - a * a) ** 0.5)
+
+    def __str__(self):
+        return "n=%d min=%s avg=%d max=%d jitter=%d us" % (self.n, self.min, self.avg(), self.max, self.jitter())
+
+
+
+
+
+def bench_convert(widths=(64, 144, 288), rows=500, level=80, path="apps/_bench.p16"):
+    """Замер конвертации строк (rows/s): native (прежний) / viper / viper+64K LUT.
+    Запускать из REPL после Ctrl-C: from apps.FrzLight import bench_convert; bench_convert()"""
+    print("width   native    viper      lut")
+    for w in widths:
+        src = bytearray(os.urandom(2 * w))
+        with open(path, "wb") as f:
+            f.write(("P16 %d 1\n" % w).encode())
+            f.write(src)
+        res = []
+        for mode in ("native", "viper", "lut"):
+            with P16Reader(path, order="GRB", level=level, lut=(mode == "lut")) as r:
+                if mode == "lut" and r._lut is None:
+                    res.append("-")
+                    continue
+                conv = r._convert_row_native if mode == "native" else r._convert_row
+                dst = memoryview(r._row_out)
+                mv = memoryview(src)
+                gc.collect()
+                t0 = time.ticks_us()
+                for _ in range(rows):
+                    conv(mv, dst, w, r._t5, r._t6, r._order_grb)
+                dt = time.ticks_diff(time.ticks_us(), t0)
+                res.append(rows * 1000000 // max(1, dt))
+        print("{:>5} {:>8} {:>8} {:>8}".format(w, *res))
+    try: os.remove(path)
+    except: pass
+
+
+def bench_preview(path=None, scale=THUMB_SCALE):
+    """Время превью (мс): прежнее drawPixel / сборка make_thumb + вывод / из библиотеки.
+    from apps.FrzLight import bench_preview; bench_preview()"""
+    lib = ImageLibrary()
+    it = lib.current()
+    if path is None:
+        if it is None:
+            print("no image")
+            return
+        path = lib.path(it["id"])
+    res = []
+    for mode in ("pixels", "build", "cached"):
+        gc.collect()
+        t0 = time.ticks_ms()
+        if mode == "pixels":
+            _preview_pixels(path, scale)
+        else:
+            t = make_thumb(path, scale) if mode == "build" else lib.thumb(it)
+            if t is None:
+                res.append("-")
+                continue
+            Lcd.drawRawBuf(t[2], 0, PREVIEW_Y, t[0], t[1], len(t[2]), True)
+        res.append(time.ticks_diff(time.ticks_ms(), t0))
+    print("preview ms  pixels %s  build %s  cached %s" % tuple(res))
@@ -1,8 +1,9 @@
 import ubluetooth as bt
-from hardware import Timer
 from M5 import *
 import gc
+from apps.interval import Intervalometer, LOG_PATH
 
+import micropython
 from micropython import const
 _IRQ_SCAN_RESULT = const(5)
 _IRQ_SCAN_DONE = const(6)
@@ -30,6 +31,11 @@ _AD_TYPE_UUID128_COMPLETE   = 0x07
 _AD_TYPE_NAME_SHORT         = 0x08
 _AD_TYPE_NAME_COMPLETE      = 0x09
 
+KEEP_ALIVE_IDLE_MS = 300000   # keep-alive: разорвать связь после 5 мин без снимков
+RECONNECT_MS = 500            # keep-alive: пауза перед переподключением после обрыва
+MULTI_MAX = 3                 # одновременных соединений (лимит NimBLE в сборке MicroPython для ESP32)
+MULTI_TRIES = 2               # залп: попыток connect на камеру (после обрыва связи), дальше она выбывает
+FAST_CONN_US = 7500           # интервал соединения для залпа: меньше интервал — меньше разброс в эфире
 
 
 
@@ -97,23 +103,86 @@ def _peer_label(peer: dict) -> str:
             pass
     return "camera"
 
+# --- состояния соединения (_Link.state) ---
+_ST_IDLE = const(0)
+_ST_CONNECT = const(1)     # ждём _IRQ_PERIPHERAL_CONNECT
+_ST_CONNECTED = const(2)   # связь есть, следующий шаг решает poll()
+_ST_ENCRYPT = const(3)     # pair: ждём _IRQ_ENCRYPTION_UPDATE
+_ST_DISCOVER = const(4)    # MTU → services → characteristics
+_ST_READY = const(5)       # handle CTRL известен, можно стрелять
+_ST_CLOSING = const(6)
+
+OP_TIMEOUT_MS = {"pair": 20000, "shot": 10000, "multi": 15000}
+
+
+class _Link:
+    """Состояние одного соединения с камерой. IRQ только меняет поля и ставит шаг,
+    сами BLE-вызовы делает CanonRemoteBLE.poll() из главного цикла."""
+    def __init__(self, addr_type, addr, h_init=None, h_ctrl=None):
+        self.addr_type = addr_type
+        self.addr = addr
+        self.name = None
+        self.conn = None
+        self.state = _ST_IDLE
+        self.encrypted = False
+        self.h_init = h_init if isinstance(h_init, int) and h_init > 0 else None
+        self.h_ctrl = h_ctrl if isinstance(h_ctrl, int) and h_ctrl > 0 else None
+        self.init_props = 0
+        self.ctrl_props = 0
+        self.svc_range = None
+        self.save = False                 # сохранить peer в poll()
+        self.keep = False                 # keep-alive: переподключать при обрыве
+        self.fast = False                 # короткий интервал соединения (залп)
+        self.failed = False               # multi: камера выбыла из залпа
+        self.tries = 0                    # multi: попыток connect в текущем залпе
+        self.step = None                  # имя отложенного шага (_step_<name>)
+        self.step_at = 0
+
+    def set_step(self, name, delay_ms=0):
+        self.step = name
+        self.step_at = time.ticks_add(time.ticks_ms(), delay_ms)
+
+    def reset_discovery(self):
+        self.svc_range = None
+        self.init_props = 0
+        self.ctrl_props = 0
+
+    def ok(self):
+        return isinstance(self.conn, int) and self.state not in (_ST_IDLE, _ST_CONNECT, _ST_CLOSING)
+
+
 class CanonRemoteBLE:
     """
-    pair(): скан → connect → (pair/шифрование если доступно) → discovery → отправить handshake (fire-and-forget)
+    Неблокирующий пульт Canon BR-E1: IRQ только фиксирует события, всю работу
+    (connect, MTU, discovery, запись) делает poll() из главного цикла.
+    Операции ставятся в очередь и выполняются по одной, по завершении
+    вызывается cb(ok):
+    request_pair(): скан → connect → pair/шифрование → discovery → handshake
             → сохранить MAC и value handles → disconnect.
-    show(): connect по сохранённому MAC (без нового pairing); если есть сохранённый handle CTRL, сразу шлёт 0x8C;
-            иначе делает discovery → (опц.) handshake → 0x8C → disconnect.
-    disconnect(): разорвать соединение и выключить BLE.
+    request_shot(): connect по сохранённому MAC (без pairing); если есть сохранённый
+            handle CTRL — сразу 0x8C, иначе discovery → 0x8C → disconnect.
+    pair()/show(): блокирующие обёртки (крутят poll() до завершения).
+    disconnect(): отменить очередь и разорвать соединения.
+    keep_alive: после снимка связь не рвётся, при обрыве poll() переподключается,
+            после idle_ms без снимков — отключается.
     """
-    def __init__(self,ble=None,app=None, my_name="M5UiFlow", store="canon_peer.json", scan_ms=5000, verbose=False):
+    def __init__(self,ble=None,app=None, my_name="M5UiFlow", store="canon_peer.json", scan_ms=5000, verbose=False,
+                 keep_alive=False, idle_ms=KEEP_ALIVE_IDLE_MS, wake=None):
         self.app=app
+        self.wake = wake                  # будить главный цикл из IRQ (main.App.wake)
+        self.keep_alive = keep_alive
+        self.idle_ms = idle_ms
         self.verbose = verbose
         self.sets_data={}
         self.store = store
         self.scan_ms = scan_ms
         self.ble=ble
-        self._store_cache = None
-        self._scan_name = None
+        self._store = None                # таблица камер {"current", "cameras"} в RAM
+        self._by_addr = {}                # addr(bytes) -> индекс в cameras
+        self._current = None              # кэш _load_peer()
+        self._dirty = False
+        self._flush_pending = False
+        self._flush_ref = self._flush_cb  # bound method заранее — schedule без аллокаций
 
 
         # включим бондинг/Just Works (если сборка поддерживает)
@@ -128,23 +197,19 @@ class CanonRemoteBLE:
         self.my_name = my_name
 
         # runtime state
-        self.conn = None
-        self.connected = False
-        self.encrypted = False
-        self.peer_addr_type = None
-        self.peer_addr = None
-
-        self._svc_range = None
-        self._h_init = None
-        self._h_ctrl = None
-        self._init_props = 0              # свойства F504 (write/no-rsp)
-        self._ctrl_props = 0
-
-        self._discovery_done = False
-        self._mode = None                 # "pair" | "show"
-        self._auto_handshake_on_discover = False
-        self._disconnect_after_handshake = False
-        self._active_op = None
+        self._links = {}                  # addr(bytes) -> _Link
+        self._ops = []                    # очередь операций
+        self._op = None                   # текущая операция
+        self._scanning = False
+        self._found = None                # (addr_type, addr, name) из скана
+
+        # keep-alive
+        self._want_link = False
+        self._last_use = 0
+        self.last_shot_ms = None          # нажатие → запись 0x8C, мс
+        self.last_spread_us = None        # multi: разброс отправки 0x8C между камерами, мкс (None — <2 камер)
+        self.last_burst = None            # multi: смещение записи каждой камеры от первой, мкс
+        self.last_burst_n = None          # multi: (выстрелило, всего)
 
         self.ble.irq(self._irq)
 
@@ -152,174 +217,269 @@ class CanonRemoteBLE:
     def _irq(self, event, data):
         if event == _IRQ_SCAN_RESULT:
             addr_type, addr, adv_type, rssi, adv = data
-            name = _adv_get_name(adv) or ""
-            if _adv_has_service(adv, _F505_UUID_LE):
-                if self.verbose:
-                    print("Found:", _mac_str(bytes(addr)), "RSSI", rssi, name)
-                self.peer_addr_type = addr_type
-                self.peer_addr = bytes(addr)
-                self._scan_name = name
-                try: self.ble.gap_scan(None)
-                except: pass
-                self.ble.gap_connect(addr_type, addr)
+            if self._scanning and self._found is None and _adv_has_service(adv, _F505_UUID_LE):
+                self._found = (addr_type, bytes(addr), _adv_get_name(adv) or "")
 
         elif event == _IRQ_SCAN_DONE:
-            if self.verbose: print("Scan done")
+            self._scanning = False
 
         elif event == _IRQ_PERIPHERAL_CONNECT:
-            self.conn, addr_type, addr = data
-            self.connected = True
-            self.encrypted = False
-            self.peer_addr_type = addr_type
-            self.peer_addr = bytes(addr)
-            if self.verbose: print("Connected to", _mac_str(self.peer_addr))
-
-            # сброс discovery-стейта
-            self._svc_range = None
-            self._h_init = None
-            self._h_ctrl = None
-            self._init_props = 0
-            self._ctrl_props = 0
-            self._discovery_done = False
-
-            if self._mode == "pair":
-                # только в режиме pair просим шифрование
-                try:
-                    self.ble.gap_pair(self.conn)
-                    if self.verbose: print("Pairing requested...")
-                except AttributeError:
-                    if self.verbose: print("gap_pair() not available")
-                # discovery стартуем после шифрования (см. _IRQ_ENCRYPTION_UPDATE)
-            else:
-                # в show() pairing не делаем — короткая пауза + MTU → discovery
-                if not self._conn_ok():
-                    return
-                usleep_ms(200)
-                try:
-                    self.ble.gattc_exchange_mtu(self.conn)
-                    usleep_ms(100)
-                except:
-                    pass
-                if self._conn_ok():
-                    self.ble.gattc_discover_services(self.conn)
+            conn, addr_type, addr = data
+            link = self._get_link(addr_type, bytes(addr))
+            link.conn = conn
+            link.encrypted = False
+            link.reset_discovery()
+            link.state = _ST_CONNECTED
+            link.set_step("connected")
 
         elif event == _IRQ_PERIPHERAL_DISCONNECT:
-            self.conn, addr_type, addr = data
-            if self.verbose: print("Disconnected")
-            if self._mode=='show':
-                self.app.set_sh(0)
-            self.connected = False
-            self.conn = None
+            # при неудачном gap_connect тоже приходит сюда (conn=0xFFFF)
+            conn, addr_type, addr = data
+            link = self._links.get(bytes(addr))
+            if link:
+                if conn == 0xFFFF:
+                    # залп: gap_connect уже прождал своё окно — камера не рекламируется, не повторяем
+                    link.tries = MULTI_TRIES
+                link.conn = None
+                link.state = _ST_IDLE
+                link.set_step("lost")
 
         elif event == _IRQ_ENCRYPTION_UPDATE:
             conn_handle, encrypted, authenticated, bonded, key_size = data
-            if conn_handle == self.conn:
-                self.encrypted = bool(encrypted)
-                if self.verbose:
-                    print(f"Encryption: enc={self.encrypted} (k{key_size})")
-                # сразу сохраним peer — чтобы адрес не потерять
-                if self.peer_addr:
-                    pass
-                    self._save_peer()  # MAC/type
-                if self._mode == "pair" and self.encrypted:
-                    # после шифрования — MTU и discovery
-                    self._svc_range = None
-                    self._h_init = None
-                    self._h_ctrl = None
-                    self._init_props = 0
-                    self._ctrl_props = 0
-                    self._discovery_done = False
-                    try: self.ble.gattc_exchange_mtu(self.conn)
-                    except: pass
-                    self.ble.gattc_discover_services(self.conn)
+            link = self._link_by_conn(conn_handle)
+            if link:
+                link.encrypted = bool(encrypted)
+                link.save = True          # сразу сохраним peer — чтобы адрес не потерять
+                if link.state == _ST_ENCRYPT and link.encrypted:
+                    link.state = _ST_DISCOVER
+                    link.set_step("mtu")
 
         elif event == _IRQ_GATTC_SERVICE_RESULT:
             conn, start, end, uuid = data
-            if conn == self.conn and uuid == SERVICE_UUID:
-                self._svc_range = (start, end)
+            link = self._link_by_conn(conn)
+            if link and uuid == SERVICE_UUID:
+                link.svc_range = (start, end)
 
         elif event == _IRQ_GATTC_SERVICE_DONE:
-            if self._svc_range:
-                s, e = self._svc_range
-                self.ble.gattc_discover_characteristics(self.conn, s, e)
-            else:
-                if self.verbose: print("F505 service not found")
+            link = self._link_by_conn(data[0])
+            if link:
+                link.set_step("chars")
 
         elif event == _IRQ_GATTC_CHARACTERISTIC_RESULT:
             conn, defh, vh, props, uuid = data
-            if conn == self.conn:
+            link = self._link_by_conn(conn)
+            if link:
                 if uuid == INIT_CHAR_UUID:
-                    self._h_init = vh
-                    self._init_props = props
-                    if self.verbose:
-                        print("INIT F504 val_handle", vh, "props", hex(props))
+                    link.h_init = vh
+                    link.init_props = props
                 elif uuid == CTRL_CHAR_UUID:
-                    self._h_ctrl = vh
-                    self._ctrl_props = props
-                    if self.verbose:
-                        print("CTRL F506 val_handle", vh, "props", hex(props))
+                    link.h_ctrl = vh
+                    link.ctrl_props = props
 
         elif event == _IRQ_GATTC_CHARACTERISTIC_DONE:
-            self._discovery_done = True
-            # Сохраним handles вместе с MAC — полезно для быстрой съёмки в show()
-            if self.peer_addr:
-                try:
-                    self._save_peer({"h_init": self._h_init or -1, "h_ctrl": self._h_ctrl or -1})
-                except:
-                    pass
-            # Авто-handshake только если включено для текущего режима (pair)
-            if self._h_init and self._auto_handshake_on_discover:
-                usleep_ms(120)
-                self._send_handshake_fire_and_forget()
-                if self._disconnect_after_handshake:
-                    usleep_ms(150)
-                    self.app.pair_done()
-                    self.app.set_sh(0)
-                    try: self.ble.gap_disconnect(self.conn)
-                    except: pass
+            link = self._link_by_conn(data[0])
+            if link:
+                link.save = True
+                link.set_step("discovered")
+
+        if self.wake and event != _IRQ_SCAN_RESULT:
+            self.wake()
+
+    # ---------- links ----------
+    def _get_link(self, addr_type, addr, h_init=None, h_ctrl=None):
+        link = self._links.get(addr)
+        if link is None:
+            link = _Link(addr_type, addr, h_init, h_ctrl)
+            self._links[addr] = link
+        return link
+
+    def _link_by_conn(self, conn):
+        for link in self._links.values():
+            if link.conn == conn:
+                return link
+        return None
+
+    def _op_link(self, link):
+        op = self._op
+        return op is not None and (op.get("link") is link or link in op.get("links", ()))
+
+    def _fail(self, link, why):
+        # в залпе одна камера не валит остальные
+        if self._op["kind"] == "multi":
+            if self.verbose: print(_mac_str(link.addr), "dropped:", why)
+            link.failed = True
+        else:
+            self._finish(False, why)
 
-    # ---------- helpers ----------
-    def _conn_ok(self):
-        return isinstance(self.conn, int) and self.connected
+    def _sh(self, state):
+        try:
+            self.app.set_sh(state)
+        except Exception as e:
+            if self.verbose: print("set_sh error:", e)
+
+    # ---------- steps (из poll) ----------
+    def _step_connect(self, link):
+        if self.verbose: print("Connecting to", _mac_str(link.addr), "type", link.addr_type)
+        try:
+            if link.fast:
+                self.ble.gap_connect(link.addr_type, link.addr, 2000, FAST_CONN_US, FAST_CONN_US)
+            else:
+                self.ble.gap_connect(link.addr_type, link.addr)
+        except OSError as e:
+            # другой connect/скан ещё идёт — повторим позже
+            if self.verbose: print("gap_connect busy:", e)
+            link.set_step("connect", 200)
+
+    def _step_connected(self, link):
+        if self.verbose: print("Connected to", _mac_str(link.addr))
+        op = self._op
+        if op and op["kind"] == "pair" and op.get("link") is link:
+            # только в режиме pair просим шифрование, discovery — после _IRQ_ENCRYPTION_UPDATE
+            link.h_init = None
+            link.h_ctrl = None
+            try:
+                link.state = _ST_ENCRYPT
+                self.ble.gap_pair(link.conn)
+                if self.verbose: print("Pairing requested...")
+                return
+            except Exception as e:
+                if self.verbose: print("gap_pair() not available:", e)
+            link.state = _ST_DISCOVER
+            link.set_step("mtu")
+        elif link.h_ctrl:
+            # быстрый путь: handle CTRL уже известен — discovery не нужен
+            link.state = _ST_READY
+        else:
+            # короткая пауза → MTU → discovery
+            link.state = _ST_DISCOVER
+            link.set_step("mtu", 200)
+
+    def _step_mtu(self, link):
+        if not link.ok():
+            return
+        try:
+            self.ble.gattc_exchange_mtu(link.conn)
+        except:
+            pass
+        link.set_step("services", 100)
+
+    def _step_services(self, link):
+        if link.ok():
+            link.reset_discovery()
+            self.ble.gattc_discover_services(link.conn)
+
+    def _step_chars(self, link):
+        if not link.ok():
+            return
+        if link.svc_range:
+            s, e = link.svc_range
+            self.ble.gattc_discover_characteristics(link.conn, s, e)
+            return
+        if self.verbose: print("F505 service not found")
+        if self._op_link(link):
+            self._fail(link, "service not found")
+        link.set_step("disconnect")
+
+    def _step_discovered(self, link):
+        if self.verbose:
+            print("INIT F504", link.h_init, hex(link.init_props), "CTRL F506", link.h_ctrl, hex(link.ctrl_props))
+        if not link.h_ctrl:
+            if self._op_link(link):
+                self._fail(link, "CTRL (F506) not discovered")
+            link.set_step("disconnect")
+            return
+        link.state = _ST_READY
+        op = self._op
+        if op and op["kind"] == "pair" and op.get("link") is link:
+            link.set_step("handshake", 120)
+
+    def _step_handshake(self, link):
+        self._send_handshake(link)
+        if self._op_link(link):
+            self._finish(True)
+        link.set_step("disconnect", 150)
+
+    def _step_disconnect(self, link):
+        if isinstance(link.conn, int):
+            link.state = _ST_CLOSING
+            try: self.ble.gap_disconnect(link.conn)
+            except: pass
+
+    def _step_lost(self, link):
+        if self.verbose: print("Disconnected", _mac_str(link.addr))
+        if self._op_link(link) and self._op["kind"] == "multi" and not link.failed:
+            # залп: повтор — когда подойдёт очередь в _drive_multi (сначала камеры с меньшим
+            # числом попыток); после MULTI_TRIES камера выбывает и остальные стреляют без неё
+            link.state = _ST_IDLE
+            if link.tries >= MULTI_TRIES:
+                if self.verbose: print("multi: give up", _mac_str(link.addr))
+                link.failed = True
+            return
+        if self._op_link(link) and self._op["kind"] != "pair" and not link.failed:
+            # связь оборвалась/не установилась до снимка — пробуем снова до дедлайна операции
+            link.state = _ST_CONNECT
+            link.set_step("connect", RECONNECT_MS)
+            return
+        if self._op_link(link):
+            self._finish(False, "link lost")
+        elif self._op is None:
+            self._sh(0)
+        if self.keep_alive and self._want_link and link.keep:
+            link.state = _ST_CONNECT
+            link.set_step("connect", RECONNECT_MS)
 
-    def _write_quiet(self, handle, data, prefer_response=True):
+    # ---------- helpers ----------
+    def _write_quiet(self, link, handle, data, prefer_response=True):
         """
         Пишем без ожидания WRITE_DONE. Если характеристика не поддерживает
         Write-with-response — используем Write-without-response.
         """
-        if not self._conn_ok():
+        if not link.ok():
             if self.verbose: print("write skipped: no conn")
-            return
+            return False
         flag = 1 if prefer_response else 0
         try:
-            self.ble.gattc_write(self.conn, handle, data, flag)
+            self.ble.gattc_write(link.conn, handle, data, flag)
         except Exception as e:
             # fallback: без ответа
             try:
-                self.ble.gattc_write(self.conn, handle, data, 0)
+                self.ble.gattc_write(link.conn, handle, data, 0)
             except:
                 if self.verbose: print("gattc_write failed:", e)
+                return False
+        return True
 
-    def _send_handshake_fire_and_forget(self):
-        if not self._h_init or not self._conn_ok():
+    def _send_handshake(self, link):
+        if not link.h_init:
             return
         payload = b"\x03" + self.my_name.encode("ascii")
         # если у F504 есть бит Write (0x08) — пробуем с ответом, но IRQ не ждём
-        prefer_rsp = (self._init_props & 0x08) != 0
+        prefer_rsp = (link.init_props & 0x08) != 0
         if self.verbose:
             mode = "with-rsp" if prefer_rsp else "no-rsp"
             print("Sending handshake", f"({mode})")
-        self._write_quiet(self._h_init, payload, prefer_response=prefer_rsp)
-
-    def _photo_fire_and_forget(self):
-        if not self._h_ctrl:
-            raise RuntimeError("CTRL (F506) not discovered")
-        if not self._conn_ok():
-            if self.verbose: print("photo skipped: no conn")
+        self._write_quiet(link, link.h_init, payload, prefer_response=prefer_rsp)
+
+    def _fire(self, link, op):
+        # с сохранённым handle props неизвестны (0) — пишем без ответа
+        prefer_rsp = (link.ctrl_props & 0x08) != 0
+        if not self._write_quiet(link, link.h_ctrl, b"\x8C", prefer_response=prefer_rsp):
+            if self.verbose: print("Fast write failed, fallback to discover")
+            link.h_ctrl = None
+            link.state = _ST_DISCOVER
+            link.set_step("mtu")
             return
-        prefer_rsp = (self._ctrl_props & 0x08) != 0
-        self.app.set_sh(2)
-        self._write_quiet(self._h_ctrl, b"\x8C", prefer_response=prefer_rsp)
+        self._sh(2)
+        self._mark_shot(op["t_press"])
+        self._finish(True)
+        if not self.keep_alive:
+            link.set_step("disconnect", 120)
+
+    def _mark_shot(self, t_press):
+        self.last_shot_ms = time.ticks_diff(time.ticks_ms(), t_press)
+        self._last_use = time.ticks_ms()
+        if self.verbose:
+            print("Shot latency", self.last_shot_ms, "ms", "(keep-alive)" if self.keep_alive else "")
 
     def _wait(self, cond, timeout_ms):
         t0 = time.ticks_ms()
@@ -329,33 +489,31 @@ class CanonRemoteBLE:
             usleep_ms(20)
         return True
 
-    def _save_peer(self, extra=None):
-        try:
-            if self.peer_addr is None:
-                return
-            obj = {"addr_type": int(self.peer_addr_type),
-                   "addr": list(self.peer_addr)}
-            if self._scan_name:
-                obj["name"] = self._scan_name
-            if extra:
-                obj.update(extra)
-
-            store = self._load_store()
-            idx = self._find_peer_index(store["cameras"], self.peer_addr)
-            if idx < 0:
-                store["cameras"].append(obj)
-                idx = len(store["cameras"]) - 1
-            else:
-                store["cameras"][idx].update(obj)
-            store["current"] = idx
-            self._write_store(store)
-            with open(self.store, "w") as f:
-                json.dump(store, f)
-
-            if self.verbose:
-                print("Saved peer:", _mac_str(self.peer_addr), "type", self.peer_addr_type, "extra", extra)
-        except Exception as e:
-            if self.verbose: print("Save error:", e)
+    # ---------- peer store ----------
+    # Таблица камер живёт в RAM (self._store), JSON парсится один раз.
+    # Изменения только помечают её грязной; запись на flash — через micropython.schedule
+    # (или из poll(), если очередь schedule занята), атомарно: tmp + rename.
+    def _save_peer(self, link, extra=None):
+        obj = {"addr_type": int(link.addr_type),
+               "addr": list(link.addr)}
+        if link.name:
+            obj["name"] = link.name
+        if extra:
+            obj.update(extra)
+
+        store = self._load_store()
+        idx = self._find_peer_index(store["cameras"], link.addr)
+        if idx < 0:
+            store["cameras"].append(obj)
+            idx = len(store["cameras"]) - 1
+            self._by_addr[bytes(link.addr)] = idx
+        else:
+            store["cameras"][idx].update(obj)
+        store["current"] = idx
+        self._mark_dirty()
+
+        if self.verbose:
+            print("Saved peer:", _mac_str(link.addr), "type", link.addr_type, "extra", extra)
 
     def _normalize_store(self, data):
         if isinstance(data, dict) and "cameras" in data:
@@ -376,48 +534,74 @@ class CanonRemoteBLE:
             return {"current": 0, "cameras": [data]}
         return {"current": 0, "cameras": []}
 
-    def _load_store(self, refresh=False):
-        if (self._store_cache is not None) and not refresh:
-            return self._normalize_store(json.loads(self._store_cache))
+    def _load_store(self):
+        # общий объект: вызывающий может менять его и звать _mark_dirty()
+        if self._store is None:
+            try:
+                with open(self.store) as f:
+                    self._store = self._normalize_store(json.load(f))
+            except:
+                self._store = {"current": 0, "cameras": []}
+            self._by_addr = {}
+            cameras = self._store["cameras"]
+            for idx in range(len(cameras)):
+                try:
+                    self._by_addr[bytes(cameras[idx]["addr"])] = idx
+                except:
+                    pass
+        return self._store
+
+    def _mark_dirty(self):
+        self._current = None
+        self._dirty = True
+        if self._flush_pending:
+            return
+        self._flush_pending = True
         try:
-            raw = open(self.store).read()
-            self._store_cache = raw
-            return self._normalize_store(json.loads(raw))
-        except:
-            store = {"current": 0, "cameras": []}
-            self._store_cache = json.dumps(store)
-            return store
+            micropython.schedule(self._flush_ref, None)
+        except RuntimeError:
+            self._flush_pending = False   # очередь schedule полна — запишет poll()
+
+    def _flush_cb(self, _):
+        self._flush_pending = False
+        self.flush_store()
 
-    def _write_store(self, store):
-        normalized = self._normalize_store(store)
-        self._store_cache = json.dumps(normalized)
+    def flush_store(self):
+        """Записать таблицу камер, если она менялась (tmp + rename, как в Insta360)."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            tmp = self.store + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._store, f)
+            try: os.remove(self.store)
+            except: pass
+            os.rename(tmp, self.store)
+        except Exception as e:
+            self._dirty = True
+            if self.verbose: print("Save error:", e)
 
     def _find_peer_index(self, cameras, addr):
-        target = list(addr)
-        for idx in range(len(cameras)):
-            if cameras[idx].get("addr") == target:
-                return idx
-        return -1
+        return self._by_addr.get(bytes(addr), -1)
 
     def _load_peer(self):
-        try:
-            store = self._load_store()
-            if not store["cameras"]:
-                return None, None, None, None
-            idx = store["current"]
-            if idx >= len(store["cameras"]):
-                idx = 0
-            d = store["cameras"][idx]
-            at = int(d["addr_type"])
-            addr = bytes(d["addr"])
-            h_init = d.get("h_init")
-            h_ctrl = d.get("h_ctrl")
-            return at, addr, h_init, h_ctrl
-        except:
-            return None, None, None, None
+        if self._current is None:
+            self._current = (None, None, None, None)
+            try:
+                store = self._load_store()
+                if store["cameras"]:
+                    idx = store["current"]
+                    if idx >= len(store["cameras"]):
+                        idx = 0
+                    d = store["cameras"][idx]
+                    self._current = (int(d["addr_type"]), bytes(d["addr"]), d.get("h_init"), d.get("h_ctrl"))
+            except:
+                pass
+        return self._current
 
     def get_peers(self):
-        return self._load_store(refresh=True)["cameras"]
+        return self._load_store()["cameras"]
 
     def get_current_index(self):
         store = self._load_store()
@@ -432,151 +616,407 @@ class CanonRemoteBLE:
         store = self._load_store()
         if not store["cameras"]:
             return "not paired"
-        idx = store["current"]
-        if idx >= len(store["cameras"]):
-            idx = 0
-        return _peer_label(store["cameras"][idx])
+        return _peer_label(store["cameras"][self.get_current_index()])
 
     def select_peer(self, index):
-        store = self._load_store(refresh=True)
+        store = self._load_store()
         if index < 0 or index >= len(store["cameras"]):
             return False
         store["current"] = index
-        self._write_store(store)
-        with open(self.store, "w") as f:
-            json.dump(store, f)
+        self._mark_dirty()
         return True
 
-    # ---------- API ----------
-    def pair(self, timeout_ms=20000):
+    # ---------- операции ----------
+    def _request(self, kind, cb, timeout_ms, **kw):
+        if timeout_ms is None:
+            timeout_ms = OP_TIMEOUT_MS[kind]
+        op = {"kind": kind, "cb": cb, "timeout": timeout_ms, "link": None}
+        op.update(kw)
+        self._ops.append(op)
+        return op
+
+    def _begin(self, op):
+        now = time.ticks_ms()
+        op["deadline"] = time.ticks_add(now, op["timeout"])
+        self._op = op
+        if op["kind"] == "pair":
+            # pairing занимает радио целиком — keep-alive связи рвём
+            self._want_link = False
+            for link in self._links.values():
+                if link.ok():
+                    link.set_step("disconnect")
+            if self.verbose: print("Scanning for Canon (F505)...")
+            self._found = None
+            self._scanning = True
+            try:
+                self.ble.gap_scan(self.scan_ms, 30000, 30000)
+            except OSError as e:
+                self._finish(False, e)
+            return
+
+        if op["kind"] == "multi":
+            links = []
+            for d in self._load_store()["cameras"][:MULTI_MAX]:
+                try:
+                    links.append(self._peer_link(d))
+                except:
+                    pass
+        else:
+            at, addr, h_init, h_ctrl = self._load_peer()
+            links = [] if at is None or addr is None else [self._get_link(at, addr, h_init, h_ctrl)]
+            op["link"] = links[0] if links else None
+        if not links:
+            self._finish(False, "not paired")
+            self._sh(3)
+            return
+        self._sh(1)
+        op["links"] = links
+        for link in self._links.values():
+            link.keep = self.keep_alive and link in links
+            link.failed = False
+            link.tries = 0
+            if self.keep_alive and not link.keep and link.ok():
+                link.set_step("disconnect")   # лишние соединения занимают слоты контроллера
+        if self.keep_alive:
+            self._want_link = True
+            self._last_use = now
+        if op["kind"] == "shot":
+            self._arm(links[0])
+        # multi: соединения поднимаются по одному в _drive() — gap_connect не параллелится
+
+    def _peer_link(self, d):
+        h_ctrl = d.get("h_ctrl")
+        link = self._get_link(int(d["addr_type"]), bytes(d["addr"]), d.get("h_init"), h_ctrl)
+        if not link.h_ctrl and isinstance(h_ctrl, int) and h_ctrl > 0:
+            link.h_ctrl = h_ctrl
+        return link
+
+    def _arm(self, link):
+        # связь уже есть или устанавливается — дождёмся READY в _drive()
+        if link.state == _ST_IDLE and link.step is None:
+            link.state = _ST_CONNECT
+            link.set_step("connect")
+
+    def _drive(self, op, now):
+        if time.ticks_diff(now, op["deadline"]) > 0:
+            self._timeout(op)
+            return
+        if op["kind"] == "pair":
+            if op["link"] is None and self._found is not None:
+                at, addr, name = self._found
+                if self.verbose: print("Found:", _mac_str(addr), name)
+                try: self.ble.gap_scan(None)
+                except: pass
+                self._scanning = False
+                link = self._get_link(at, addr)
+                link.name = name
+                link.state = _ST_CONNECT
+                link.set_step("connect")
+                op["link"] = link
+            elif op["link"] is None and not self._scanning:
+                self._finish(False, "camera not found")
+            return
+        if op["kind"] == "multi":
+            self._drive_multi(op)
+            return
+        link = op["link"]
+        if link.state == _ST_READY and link.ok():
+            if op.get("handshake"):
+                self._send_handshake(link)
+            self._fire(link, op)
+
+    def _drive_multi(self, op):
+        links = op["links"]
+        pending = False
+        for link in links:
+            if link.failed or (link.state == _ST_READY and link.ok()):
+                continue
+            pending = True
+            if link.state == _ST_CONNECT:
+                return                    # ждём текущий gap_connect
+        if pending:
+            idle = [l for l in links if not l.failed and l.state == _ST_IDLE and l.step is None]
+            if idle:
+                link = min(idle, key=lambda l: l.tries)
+                link.tries += 1
+                link.fast = True
+                self._arm(link)
+            return                        # идёт discovery/закрытие
+        self._burst(op)
+
+    def _burst(self, op):
         """
-        Скан → connect → (pair, если доступно) → discovery → отправить handshake (fire-and-forget) →
-        сохранить MAC и value handles → disconnect. Не ждём WRITE_DONE.
+        Залп: 0x8C во все готовые камеры подряд (без ответа), между записями только
+        ticks_us. last_spread_us — разброс постановки записей в стек (первая–последняя
+        удачная), а не измеренный разброс срабатывания камер: в эфире к нему добавляется
+        до одного интервала соединения (FAST_CONN_US) на камеру. None — выстрелило меньше двух.
         """
-        self._mode = "pair"
-        self._auto_handshake_on_discover = True
-        self._disconnect_after_handshake = True
-
-        if self.verbose: print("Scanning for Canon (F505)...")
-        self.ble.gap_scan(self.scan_ms, 30000, 30000)
+        ready = [(l.conn, l.h_ctrl) for l in op["links"] if not l.failed and l.state == _ST_READY and l.ok()]
+        if not ready:
+            self._finish(False, "no camera ready")
+            return
+        write = self.ble.gattc_write
+        stamps = []
+        t_first = time.ticks_us()
+        for conn, h in ready:
+            try:
+                write(conn, h, b"\x8C", 0)
+                stamps.append(time.ticks_diff(time.ticks_us(), t_first))
+            except:
+                stamps.append(-1)
+        ok = [t for t in stamps if t >= 0]
+        fired = len(ok)
+        self.last_spread_us = max(ok) - min(ok) if fired >= 2 else None
+        self.last_burst = stamps
+        self._sh(2)
+        self._mark_shot(op["t_press"])
+        if self.verbose:
+            print("Burst", fired, "/", len(op["links"]), "cams, spread", self.last_spread_us, "us", stamps)
+        self.last_burst_n = (fired, len(op["links"]))
+        self._finish(fired == len(op["links"]), None if fired == len(op["links"]) else "not all cameras fired")
+        if not self.keep_alive:
+            for link in op["links"]:
+                if link.ok():
+                    link.set_step("disconnect", 120)
+
+    def _timeout(self, op):
+        if op["kind"] == "multi":
+            # кто успел — стреляет, остальные выбывают
+            if self.verbose: print("multi timeout")
+            for link in op["links"]:
+                if not (link.state == _ST_READY and link.ok()):
+                    link.failed = True
+                    self._cancel(link)
+            self._burst(op)
+            return
+        link = op["link"]
+        if self.verbose: print(op["kind"], "timeout")
+        if self._scanning:
+            try: self.ble.gap_scan(None)
+            except: pass
+            self._scanning = False
+        if link is not None and not self.keep_alive:
+            self._cancel(link)
+        self._finish(False, "timeout")
+
+    def _cancel(self, link):
+        if link.ok():
+            link.set_step("disconnect")
+        elif link.state == _ST_CONNECT:
+            # отменить незавершённый gap_connect
+            try: self.ble.gap_connect(None)
+            except: pass
+            link.state = _ST_IDLE
+            link.step = None
 
-        if not self._wait(lambda: self.connected, timeout_ms):
-            self.app.set_sh(3)
-            self.app.pair_done()
-            return False
+    def _finish(self, ok, why=None):
+        op = self._op
+        self._op = None
+        if op is None:
+            return
+        if self.verbose and why: print(op["kind"], "failed:", why)
+        if op["kind"] == "pair":
+            self._sh(0 if ok else 3)
+        elif not ok:
+            self._sh(0)
+        cb = op["cb"]
+        if cb:
+            try:
+                cb(ok)
+            except Exception as e:
+                if self.verbose: print("op callback error:", e)
 
-        # дождёмся хотя бы discovery (handshake шлём в CHARACTERISTIC_DONE)
-        self._wait(lambda: self._discovery_done, 5000)
-        # немного подождать, затем разорвать
-        self._wait(lambda: not self.connected, 3000)
+    # ---------- API ----------
+    def request_pair(self, cb=None, timeout_ms=None):
+        """
+        Поставить в очередь pairing: скан → connect → pair/шифрование → discovery →
+        handshake → сохранить MAC и handles → disconnect. Не блокирует; cb(ok) — из poll().
+        """
+        return self._request("pair", cb, timeout_ms)
 
-        # адрес/handles должны быть сохранены в ENCRYPTION_UPDATE/CHAR_DONE; если нет — попробуем сейчас
-        if self.peer_addr and (self.store not in os.listdir()):
-            self._save_peer()
-        return self.peer_addr is not None
+    def request_shot(self, cb=None, t_press=None, timeout_ms=None, force_handshake=False):
+        """
+        Поставить в очередь снимок по сохранённому MAC. Не блокирует; cb(ok) — из poll().
+        t_press — ticks_ms нажатия, от него считается last_shot_ms.
+        """
+        if t_press is None:
+            t_press = time.ticks_ms()
+        return self._request("shot", cb, timeout_ms, t_press=t_press, handshake=force_handshake)
 
-    def show(self, timeout_ms=10000, force_handshake=False):
+    def request_multi_shot(self, cb=None, t_press=None, timeout_ms=None):
         """
-        Подключается по сохранённому MAC, без pairing.
-        Если есть сохранённый handle F506 — сразу шлёт 0x8C и отключается.
-        Иначе (или при ошибке) — делает discovery и потом шлёт.
+        Поставить в очередь залп по всем сохранённым камерам (до MULTI_MAX): соединения
+        поднимаются по одному, после discovery все «взведены», затем 0x8C подряд.
+        Не блокирует; cb(ok) — из poll(), ok=False если выстрелили не все.
         """
-        self.app.set_sh(1)
-        self._mode = "show"
-        self._auto_handshake_on_discover = False
-        self._disconnect_after_handshake = False
-
-        at, addr, h_init_saved, h_ctrl_saved = self._load_peer()
-        if at is None or addr is None:
-            self.app.set_sh(3)
+        if t_press is None:
+            t_press = time.ticks_ms()
+        return self._request("multi", cb, timeout_ms, t_press=t_press)
+
+    def prepare(self, multi=False):
+        """Заранее поднять соединение с текущей (multi — со всеми) камерой, без снимка.
+        Интервалометр зовёт за ARM_LEAD_MS до дедлайна, чтобы снимок шёл по быстрому пути."""
+        if self._op is not None and self._op["kind"] == "pair":
             return
+        if multi:
+            # по одной: параллельный gap_connect вернёт EALREADY, _step_connect повторит
+            for d in self._load_store()["cameras"][:MULTI_MAX]:
+                link = self._peer_link(d)
+                link.fast = True
+                self._arm(link)
+            return
+        at, addr, h_init, h_ctrl = self._load_peer()
+        if at is not None:
+            self._arm(self._get_link(at, addr, h_init, h_ctrl))
 
-        if self.verbose: print("Connecting to", _mac_str(addr), "type", at)
-        self.ble.gap_connect(at, addr)
-        if not self._wait(lambda: self.connected, timeout_ms):
-            if self.verbose: print("show(): connect timeout")
-            return False
-
-        # --- Быстрый путь: сразу писать в сохранённый handle CTRL ---
-        fast_ok = False
-        if isinstance(h_ctrl_saved, int) and h_ctrl_saved > 0:
-            try:
-                # fire-and-forget; используем без ответа, чтобы не зависеть от WRITE_DONE
-                if not self._conn_ok():
-                    raise OSError("no conn")
-                self.app.set_sh(2)
-                self.ble.gattc_write(self.conn, h_ctrl_saved, b"\x8C", 0)
-                fast_ok = True
-                if self.verbose: print("Shot via saved handle:", h_ctrl_saved)
-            except Exception as e:
-                if self.verbose: print("Fast write failed, fallback to discover:", e)
-
-        if fast_ok:
-            usleep_ms(120)
-            try: self.ble.gap_disconnect(self.conn)
-            except: pass
-            self._wait(lambda: not self.connected, 2000)
+    def busy(self):
+        """Есть незавершённые операции или шаги соединений."""
+        if self._op is not None or self._ops:
             return True
+        for link in self._links.values():
+            if link.step is not None or link.state in (_ST_CONNECT, _ST_CLOSING):
+                return True
+        return False
 
-        # --- Fallback: discovery и обычная съёмка ---
-        self._svc_range = None; self._h_init = None; self._h_ctrl = None
-        self._init_props = 0; self._ctrl_props = 0
-        self._discovery_done = False
-
-        # небольшая пауза + (опц.) MTU
-        if not self._conn_ok():
-            if self.verbose: print("show(): link lost before discovery")
-            return False
-        usleep_ms(200)
-        try:
-            self.ble.gattc_exchange_mtu(self.conn)
-            usleep_ms(100)
-        except:
-            pass
-        if not self._conn_ok():
-            if self.verbose: print("show(): link lost before discovery (after MTU)")
-            return False
-        self.ble.gattc_discover_services(self.conn)
-        if not self._wait(lambda: self._discovery_done and self._h_ctrl is not None and self._conn_ok(), 5000):
-            if self.verbose: print("show(): discover timeout")
-            try: self.ble.gap_disconnect(self.conn)
-            except: pass
-            return False
+    def _run(self, op, tail_ms=2000):
+        # блокирующее ожидание операции + хвоста (disconnect) через poll()
+        t0 = time.ticks_ms()
+        limit = op["timeout"] + tail_ms
+        while (op in self._ops or op is self._op or self.busy()) and time.ticks_diff(time.ticks_ms(), t0) < limit:
+            self.poll()
+            time.sleep_ms(5)
 
-        # опциональный handshake в каждом сеансе
-        if force_handshake and self._h_init:
-            self._send_handshake_fire_and_forget()
-            usleep_ms(100)
+    def pair(self, timeout_ms=20000):
+        """Блокирующий pairing (крутит poll() до завершения)."""
+        res = [False]
+        def done(ok):
+            res[0] = ok
+            if self.app: self.app.pair_done(ok)
+        self._run(self.request_pair(cb=done, timeout_ms=timeout_ms))
+        return res[0]
+
+    def show(self, timeout_ms=10000, force_handshake=False, t_press=None):
+        """
+        Блокирующий снимок (крутит poll() до завершения): connect по сохранённому MAC,
+        0x8C в сохранённый handle CTRL или после discovery, затем disconnect.
+        В режиме keep_alive связь не рвётся.
+        """
+        res = [False]
+        def done(ok):
+            res[0] = ok
+        self._run(self.request_shot(cb=done, t_press=t_press, timeout_ms=timeout_ms,
+                                    force_handshake=force_handshake), 0 if self.keep_alive else 2000)
+        return res[0]
+
+    def poll(self):
+        """Главный цикл: шаги соединений, отложенные записи, очередь операций, keep-alive."""
+        now = time.ticks_ms()
+        for link in list(self._links.values()):
+            if link.step is not None and time.ticks_diff(now, link.step_at) >= 0:
+                step = link.step
+                link.step = None
+                try:
+                    getattr(self, "_step_" + step)(link)
+                except Exception as e:
+                    if self.verbose: print("step", step, "error:", e)
+                    if self._op_link(link):
+                        self._fail(link, e)
+            if link.save:
+                link.save = False
+                extra = None
+                if link.h_init or link.h_ctrl:
+                    extra = {"h_init": link.h_init or -1, "h_ctrl": link.h_ctrl or -1}
+                self._save_peer(link, extra)
+        if self._dirty and not self._flush_pending:
+            self.flush_store()
+
+        if self._op is None and self._ops:
+            self._begin(self._ops.pop(0))
+        if self._op is not None:
+            self._drive(self._op, now)
+
+        if self.keep_alive and self._want_link and time.ticks_diff(now, self._last_use) > self.idle_ms:
+            if self.verbose: print("keep-alive: idle timeout")
+            self._want_link = False
+            for link in self._links.values():
+                if link.ok():
+                    link.set_step("disconnect")
 
-        # фото (fire-and-forget)
-        self._photo_fire_and_forget()
+    def disconnect(self):
+        """Отменить очередь, разорвать все соединения и дописать таблицу камер."""
+        self.flush_store()
+        self._want_link = False
+        for link in self._links.values():
+            link.keep = False
+        self._ops = []
+        self._op = None
+        if self._scanning:
+            try: self.ble.gap_scan(None)
+            except: pass
+            self._scanning = False
+        for link in self._links.values():
+            link.step = None
+            try:
+                if isinstance(link.conn, int):
+                    self.ble.gap_disconnect(link.conn)
+            except:
+                pass
+        self._wait(lambda: not any(isinstance(l.conn, int) for l in self._links.values()), 1000)
+        if self.verbose: print("BLE stopped")
 
-        # обновим сохранённые handles, чтобы в следующий раз был быстрый путь
-        try:
-            self._save_peer({"h_init": self._h_init or -1, "h_ctrl": self._h_ctrl or -1})
-        except:
-            pass
 
-        usleep_ms(120)
-        try: self.ble.gap_disconnect(self.conn)
-        except: pass
-        self._wait(lambda: not self.connected, 2000)
-        return True
 
-    def disconnect(self):
-        try:
-            if self.connected and self.conn is not None:
-                self.ble.gap_disconnect(self.conn)
-        except:
-            pass
-        self._wait(lambda: not self.connected, 1000)
-        if self.verbose: print("BLE stopped")
 
 
 
 
 
+def bench_store(store="apps/canon_new.json", n=200):
+    """Замер таблицы камер: поиск (старый путь — json.loads кэш-строки на каждый вызов,
+    новый — таблица в RAM) и длительность IRQ-обработчика (раньше писал файл прямо в IRQ).
+    Запускать из REPL после Ctrl-C: from apps.canon import bench_store; bench_store()"""
+    tmp = store + ".bench"
+    try:
+        with open(store) as f:
+            raw = f.read()
+    except OSError:
+        raw = json.dumps({"current": 0, "cameras": [{"addr_type": 0, "addr": [1, 2, 3, 4, 5, 6], "h_ctrl": 5}]})
+    with open(tmp, "w") as f:
+        f.write(raw)
+    r = CanonRemoteBLE(ble=bt.BLE(), store=tmp)
 
+    def us(fn):
+        gc.collect()
+        t0 = time.ticks_us()
+        for _ in range(n):
+            fn()
+        return time.ticks_diff(time.ticks_us(), t0) // n
+
+    def old_lookup():
+        d = r._normalize_store(json.loads(raw))
+        d["cameras"][d["current"]]
+    print("lookup   json re-parse", us(old_lookup), "us")
+    r._load_store()
+    print("lookup   in-RAM       ", us(r._load_peer), "us (_load_peer)")
+    print("lookup   in-RAM       ", us(r.get_current_label), "us (get_current_label)")
+
+    at, addr, _, _ = r._load_peer()
+    link = r._get_link(at, addr)
+    link.conn = 0
+    def old_irq():
+        # так раньше делал IRQ на ENCRYPTION_UPDATE / CHARACTERISTIC_DONE
+        r._save_peer(link)
+        r.flush_store()
+    def new_irq():
+        r._irq(_IRQ_GATTC_CHARACTERISTIC_DONE, (0, 0))
+        link.step = None
+        link.save = False
+    n0, n = n, 20
+    print("irq      save in IRQ  ", us(old_irq), "us")
+    n = n0
+    print("irq      flags only   ", us(new_irq), "us")
+    try: os.remove(tmp)
+    except: pass
 
 
 class App:
@@ -587,9 +1027,10 @@ class App:
         self.int_mode=False
         self.sh_state=0
         self.time_to_shoot=0
-        self.int_is_start=False
+        self.engine=None
         self.is_busy=False
         self.current_camera_label='not paired'
+        self.cam_count=0
         
     def start(self,app):
         self.app=app
@@ -597,8 +1038,13 @@ class App:
         self.int_mode=not not self.app.get_set("canon_int","int",0)
         self.sh_state=0
 
-        self.bt=CanonRemoteBLE(ble=app.ble,app=self,my_name=self.app.config['name'],store='apps/canon_new.json',verbose=True)
+        self.keep_alive=not not self.app.get_set("canon_keep","int",0)
+        self.multi=not not self.app.get_set("canon_all","int",0)
+        self.bt=CanonRemoteBLE(ble=app.ble,app=self,my_name=self.app.config['name'],store='apps/canon_new.json',verbose=True,
+                               keep_alive=self.keep_alive,wake=self.app.wake)
         self.current_camera_label=self.bt.get_current_label()
+        self.cam_count=len(self.bt.get_peers())
+        self.app.loop_callback=self.loop
         self.app.callback_table['ok']=self.shoot
         self.app.callback_table['right']=self.minus_timer
         self.app.callback_table['left']=self.plus_timer       
@@ -618,6 +1064,8 @@ class App:
                 label = "* " + label
             items.append(label)
         items.append("+ Add camera")
+        items.append("Keep link: on" if self.keep_alive else "Keep link: off")
+        items.append("All cameras: on" if self.multi else "All cameras: off")
         self.app.gui.show_list(
             data=items,
             current=current,
@@ -627,11 +1075,25 @@ class App:
 
     def camera_menu_select(self, index):
         peers = self.bt.get_peers()
+        if index == len(peers) + 2:
+            self.multi = not self.multi
+            self.app.save_set("canon_all", 1 if self.multi else 0, "int")
+            self.draw()
+            return
+        if index == len(peers) + 1:
+            self.keep_alive = not self.keep_alive
+            self.bt.keep_alive = self.keep_alive
+            if not self.keep_alive:
+                self.bt.disconnect()
+            self.app.save_set("canon_keep", 1 if self.keep_alive else 0, "int")
+            self.draw()
+            return
         if index >= len(peers):
             self.start_pair()
             return
         self.bt.select_peer(index)
         self.current_camera_label=self.bt.get_current_label()
+        self.cam_count=len(self.bt.get_peers())
         self.draw()
         
     def start_pair(self):
@@ -639,7 +1101,7 @@ class App:
             return
         self.is_busy=True
         self.app.gui.waiter.start(title='Pairing...')
-        self.bt.pair()
+        self.bt.request_pair(cb=self.pair_done)
     def set_sh(self,state):
         self.sh_state=state
         self.draw()
@@ -648,49 +1110,75 @@ class App:
         if self.is_busy:
             return
         
+        t_press=time.ticks_ms()
         if self.timer_mode==0:
-            self.is_busy=True
-            try:
-                self.bt.show()
-            finally:
-                self.is_busy=False
+            self.request_shot(t_press)
+        elif self.engine:
+            print('STOP INTERVAL')
+            self.stop_engine()
         else:
-            if self.int_mode and (not self.int_is_start):
-                self.int_is_start=True
-            elif self.int_mode and self.int_is_start:
-                print('DEINIT TIMER')
-                self.timer.deinit()
-                self.time_to_shoot=0
-                self.draw()
-                self.int_is_start=False
-                return
-                
-                
-            self.timer=Timer(3)
-            self.time_to_shoot=self.timer_mode
-            self.draw()
-            self.timer.init(mode=Timer.PERIODIC, period=1000, callback=self.timer_callback)
-            
-    def timer_callback(self,event=None):
-        if self.is_busy:
-            return
-        self.time_to_shoot-=1
-        self.draw()
-        if self.time_to_shoot==0:
-            if not(self.int_mode):
-                self.timer.deinit()
-                self.time_to_shoot=0
-            else:
-                self.time_to_shoot=self.timer_mode
-            self.is_busy=True
+            self.start_engine()
+
+    def request_shot(self,t_press=None,cb=None):
+        if self.multi:
+            self.bt.request_multi_shot(cb=cb,t_press=t_press)
+        else:
+            self.bt.request_shot(cb=cb,t_press=t_press)
+
+    def start_engine(self):
+        # интервалометр (или разовый автоспуск) по дедлайнам, без Timer и без дрейфа;
+        # apps/interval.json (опц.) переопределяет: interval_ms, count, ramp_to_ms
+        interval=self.timer_mode*1000
+        count=0 if self.int_mode else 1
+        ramp=None
+        if self.int_mode:
             try:
-                self.bt.show()
-            finally:
-                self.is_busy=False
-            
-        
-            
-        
+                cfg=json.loads(open('apps/interval.json').read())
+                interval=cfg.get('interval_ms',interval)
+                count=cfg.get('count',count)
+                ramp=cfg.get('ramp_to_ms')
+            except:
+                pass
+        self.engine=Intervalometer(fire=self.engine_fire,interval_ms=interval,count=count,
+                                   first_ms=self.timer_mode*1000,ramp_to_ms=ramp,
+                                   arm=self.engine_arm,wake_at=self.app.wake_at,
+                                   log=LOG_PATH if self.int_mode else None)
+        if self.engine.hold:
+            self.bt.keep_alive=True
+        self.engine.start()
+        self.time_to_shoot=self.timer_mode
+        self.draw()
+
+    def stop_engine(self):
+        self.engine.stop()
+        if self.engine.max_late_ms:
+            print('interval: shots',self.engine.shots,'max late',self.engine.max_late_ms,'ms')
+        self.engine=None
+        self.time_to_shoot=0
+        if self.bt.keep_alive and not self.keep_alive:
+            self.bt.keep_alive=False
+            self.bt.disconnect()
+        self.draw()
+
+    def engine_fire(self,planned,done):
+        self.request_shot(t_press=planned,cb=done)
+
+    def engine_arm(self):
+        self.bt.prepare(self.multi)
+
+    def loop(self):
+        if self.engine:
+            self.engine.poll()
+        self.bt.poll()
+        if self.engine:
+            if not self.engine.busy():
+                self.stop_engine()
+                return
+            left=(self.engine.remaining_ms()+999)//1000
+            if left!=self.time_to_shoot and left:
+                self.time_to_shoot=left
+                self.draw()
+
     def draw(self):
         gc.collect()
         Lcd.startWrite()
@@ -710,6 +1198,8 @@ class App:
             y = 40                            
             Lcd.drawString('intervalometer', x, y)
         cam_name = self.current_camera_label
+        if self.multi:
+            cam_name = f'all cameras ({min(self.cam_count,MULTI_MAX)})'
         if len(cam_name) > 18:
             cam_name = cam_name[:18]
         Lcd.setFont(Widgets.FONTS.DejaVu12)
@@ -735,6 +1225,19 @@ class App:
             x = (125 - w) // 2+6
             y = 161                         
             Lcd.drawString(str(self.time_to_shoot), x, y)
+        if self.bt.last_shot_ms is not None:
+            Lcd.setFont(Widgets.FONTS.DejaVu12)
+            Lcd.setTextColor(0x999999, 0x000000)
+            txt=f'{self.bt.last_shot_ms} ms'+(' keep' if self.keep_alive else '')
+            if self.multi and self.bt.last_burst_n:
+                txt=f'{self.bt.last_burst_n[0]}/{self.bt.last_burst_n[1]}'
+                if self.bt.last_spread_us is None:
+                    txt+=' cams'
+                else:
+                    txt+=f' spread {self.bt.last_spread_us/1000:.1f}ms'
+            w = Lcd.textWidth(txt)
+            x = (125 - w) // 2+5
+            Lcd.drawString(txt, x, 224)
         Lcd.endWrite()
             
         gc.collect()
@@ -756,15 +1259,18 @@ class App:
         self.draw()
         self.app.save_set("canon_int",1 if self.int_mode else 0,"int")
          
-    def pair_done(self):
+    def pair_done(self,ok=True):
         self.is_busy=False
         self.current_camera_label=self.bt.get_current_label()
+        self.cam_count=len(self.bt.get_peers())
         self.app.gui.waiter.stop()
         self.draw()
         
         
         
     def stop(self):
+        if self.engine:
+            self.engine.stop()
         self.bt.disconnect()
         self.app.stop_app()
         self.app.gui.show_main_menu()
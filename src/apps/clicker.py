@@ -649,6 +649,7 @@ class App:
         Lcd.setFont(Widgets.FONTS.DejaVu12)
         Lcd.setTextColor(self._fg, self._bg)
         Lcd.clear(self._bg)
+        self.app.gui.invalidate_title()
 
         self.set_status('waiting')
 
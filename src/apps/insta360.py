@@ -3,6 +3,7 @@ import bluetooth as bt
 from micropython import const
 import time, json, os, gc
 from hardware import Timer
+from apps.interval import Intervalometer
 
 # ---------- утилиты ----------
 def format_mmss(seconds: int) -> str:
@@ -364,7 +365,11 @@ class Insta360BLE_MP:
                 print("[{}] {}  RSSI {:>4}  {}".format(i, d["mac"], d["rssi"], d["name"] or ""))
         return list(self._found)
 
-    def connect_last(self, timeout_ms=6000):
+    def ready(self):
+        return self.connected and self._disc_done and self._h_cmd is not None
+
+    def begin_connect_last(self):
+        """gap_connect к сохранённой камере без ожидания (discovery доведёт _irq). -> False, если не начали."""
         at, adr, nm = self._load_peer()
         self.current_name = nm
         if at is None or adr is None:
@@ -373,7 +378,18 @@ class Insta360BLE_MP:
             return False
         if self.verbose:
             print("connecting to last:", _mac_str(adr), nm or "")
-        self.ble.gap_connect(at, adr)
+        try:
+            self.ble.gap_connect(at, adr)
+        except OSError as e:
+            # предыдущий gap_connect ещё идёт
+            if self.verbose:
+                print("gap_connect busy:", e)
+            return False
+        return True
+
+    def connect_last(self, timeout_ms=6000):
+        if not self.begin_connect_last():
+            return False
         if not self._wait(lambda: self.connected, timeout_ms):
             if self.verbose:
                 print("connect timeout")
@@ -463,7 +479,13 @@ class App:
         self.command_state = 0
         self.video_state = 0
         self.connected = False
+        self.interval = self.app.get_set("insta_int", "int", 5)
+        self.engine = None
+        self.time_to_shoot = 0
         self.bt = Insta360BLE_MP(ble=app.ble, app=self, store='apps/insta_new.json', verbose=True)
+        self.app.loop_callback = self.loop
+        self.app.callback_table['left'] = self.plus_interval
+        self.app.callback_table['right'] = self.minus_interval
 
         self.app.callback_table_long['left'] = self.select_camera
         self.app.callback_table_long['ok'] = self.change_mode
@@ -472,13 +494,18 @@ class App:
         self.draw()
 
     def change_mode(self):
+        if self.engine:
+            return
         self.mode += 1
-        if self.mode > 1:
+        if self.mode > 2:
             self.mode = 0
         self.draw()
         self.app.save_set("insta_mode", self.mode, "int")
 
     def stop(self):
+        if self.engine:
+            self.engine.stop()
+        self.app.loop_callback = None
         self.bt.disconnect()
         self.app.stop_app()
         self.app.gui.show_main_menu()
@@ -512,6 +539,12 @@ class App:
         return result
 
     def shot(self):
+        if self.mode == 2:
+            if self.engine:
+                self.stop_engine()
+            else:
+                self.start_engine()
+            return
         if not self.connected:
             if not self.connect():
                 return
@@ -532,6 +565,89 @@ class App:
                 self.video_state = 0
                 self.bt.stop_rec()
 
+    # ---------- интервалометр (режим 2) ----------
+    def start_engine(self):
+        # соединение поднимаем здесь (по кнопке, как в shot): в loop() блокироваться нельзя
+        if not self.connected and not self.connect():
+            return
+        try:
+            self.bt.set_photo()
+        except Exception as e:
+            print('interval arm error:', e)
+            return
+        # apps/interval.json (опц.) переопределяет: interval_ms, count, ramp_to_ms
+        interval = self.interval * 1000
+        count = 0
+        ramp = None
+        try:
+            cfg = json.loads(open('apps/interval.json').read())
+            interval = cfg.get('interval_ms', interval)
+            count = cfg.get('count', count)
+            ramp = cfg.get('ramp_to_ms')
+        except:
+            pass
+        self.engine = Intervalometer(fire=self.engine_fire, interval_ms=interval, count=count,
+                                     ramp_to_ms=ramp, arm=self.engine_arm, wake_at=self.app.wake_at)
+        self.engine.start()
+        self.time_to_shoot = (interval + 999) // 1000
+        self.draw()
+
+    def stop_engine(self):
+        self.engine.stop()
+        print('interval: shots', self.engine.shots, 'max late', self.engine.max_late_ms, 'ms')
+        self.engine = None
+        self.time_to_shoot = 0
+        self.command_state = 0
+        self.draw()
+
+    def engine_arm(self):
+        # связь с Insta360 постоянная; упала — только запускаем gap_connect, без ожидания:
+        # не успела подняться к снимку — engine_fire отчитается done(False)
+        if not self.bt.ready():
+            self.bt.begin_connect_last()
+
+    def engine_fire(self, planned, done):
+        if not self.bt.ready():
+            done(False)
+            return
+        if not self.connected:
+            self.connected = True
+            self.draw()
+        ok = False
+        try:
+            # режим фото выставлен в start_engine; здесь одна короткая запись без пауз
+            self.bt.apply()
+            ok = True
+        except Exception as e:
+            print('interval shot error:', e)
+        done(ok)
+
+    def loop(self):
+        if not self.engine:
+            return
+        self.engine.poll()
+        if not self.engine.busy():
+            self.stop_engine()
+            return
+        left = (self.engine.remaining_ms() + 999) // 1000
+        if left != self.time_to_shoot and left:
+            self.time_to_shoot = left
+            self.draw()
+
+    def plus_interval(self):
+        if self.mode != 2 or self.engine:
+            return
+        self.interval = min(60, self.interval + 1)
+        self.draw()
+        self.app.save_set("insta_int", self.interval, "int")
+
+    def minus_interval(self):
+        if self.mode != 2 or self.engine:
+            return
+        self.interval = max(1, self.interval - 1)
+        self.draw()
+        self.app.save_set("insta_int", self.interval, "int")
+
     def rec_start(self):
         self.rec_time = time.time()
         self.timer = Timer(3)
@@ -570,6 +686,9 @@ class App:
         if self.mode == 0:
             Lcd.drawImage("apps/insta_photo.bmp", x, y)
             txt = "PHOTO"
+        elif self.mode == 2:
+            Lcd.drawImage("apps/insta_photo.bmp", x, y)
+            txt = f"{self.interval}s INT"
         else:
             Lcd.drawImage("apps/insta_video.bmp", x, y)
             txt = "VIDEO"
@@ -582,6 +701,12 @@ class App:
 
         color = [0x090909, 0x996600, 0x990000]
         Lcd.fillCircle(int(Lcd.width()/2), 150, 30, color[self.command_state])
+        if self.engine:
+            Lcd.setFont(Widgets.FONTS.DejaVu24)
+            Lcd.setTextColor(0xffffff, color[self.command_state])
+            txt = str(self.time_to_shoot)
+            w = Lcd.textWidth(txt)
+            Lcd.drawString(txt, (125 - w) // 2 + 6, 138)
 
         if self.command_state == 2:
             Lcd.setFont(Widgets.FONTS.DejaVu40)
@@ -0,0 +1,211 @@
+import time, struct
+try:
+    from micropython import const
+except ImportError:           # read_log()/log_stats() на хосте
+    const = lambda x: x
+
+# Интервалометр без дрейфа: снимки планируются от абсолютных ticks_ms-дедлайнов
+# (следующий = предыдущий плановый + интервал), а не от момента фактического снимка,
+# поэтому время connect/записи не накапливается. Крутится из loop_callback, главный
+# цикл будится к дедлайну через main.App.wake_at.
+
+ARM_LEAD_MS = 3000        # за сколько до снимка поднимать соединение
+HOLD_MS = 5000            # интервал короче lead+HOLD_MS — связь между снимками не рвём
+MAX_INTERVAL_MS = 86400000  # 24 ч; ticks_diff корректен до 2**29 мс (~6 суток)
+LOG_PATH = "apps/interval.log"
+
+# лог: заголовок b"IVL1" + <interval_ms, count, ramp_to_ms(-1 нет)>, далее записи
+# <номер, план от старта мс, опоздание мс, статус>
+_LOG_HDR = "<4sIIi"
+_LOG_REC = "<IIhB"
+_REC_SIZE = const(11)
+_LOG_BATCH = const(32)    # записей в RAM до сброса на flash
+
+SHOT_FAIL = const(0)
+SHOT_OK = const(1)
+SHOT_SKIP = const(2)      # дедлайн пропущен (предыдущий снимок ещё не завершён)
+
+
+class Intervalometer:
+    """
+    fire(planned_ticks, done) — сделать снимок, по завершении вызвать done(ok);
+            planned_ticks удобно передать как t_press, тогда задержка считается от плана.
+    arm() — (опц.) поднять соединение заранее, вызывается за lead_ms до дедлайна.
+    count — число снимков (0 — без ограничения), first_ms — задержка до первого
+    (по умолчанию = interval_ms), ramp_to_ms — интервал к последнему снимку
+    (линейно от interval_ms, нужен count > 1).
+    """
+    def __init__(self, fire, interval_ms, count=0, first_ms=None, ramp_to_ms=None, arm=None,
+                 lead_ms=ARM_LEAD_MS, wake_at=None, log=LOG_PATH):
+        self.fire = fire
+        self.arm = arm
+        self.interval_ms = max(1, min(int(interval_ms), MAX_INTERVAL_MS))
+        self.count = count
+        self.first_ms = self.interval_ms if first_ms is None else first_ms
+        self.ramp_to_ms = ramp_to_ms if (ramp_to_ms and count > 1) else None
+        self.lead_ms = lead_ms
+        self.wake_at = wake_at
+        self.log = log
+        # короткий интервал: держать связь между снимками дешевле, чем переподключаться
+        self.hold = self.interval_ms < lead_ms + HOLD_MS
+        self.running = False
+        self._firing = False
+        self.shots = 0            # сколько дедлайнов обработано
+        self.last_late_ms = None
+        self.max_late_ms = 0
+        self._done_ref = self._done
+        self._buf = bytearray(_LOG_BATCH * _REC_SIZE)
+        self._nbuf = 0
+
+    def interval_at(self, i):
+        """Интервал перед снимком i (0 — первый после старта)."""
+        if i == 0:
+            return self.first_ms
+        if self.ramp_to_ms is None:
+            return self.interval_ms
+        # count-1 промежутков: первый = interval_ms, последний = ramp_to_ms
+        return self.interval_ms + (self.ramp_to_ms - self.interval_ms) * (i - 1) // max(1, self.count - 2)
+
+    def start(self):
+        self.t0 = time.ticks_ms()   # база следующего дедлайна (предыдущий плановый)
+        self.planned = 0          # план текущего снимка от старта, мс (для лога)
+        self.shots = 0
+        self.max_late_ms = 0
+        self.last_late_ms = None
+        self._firing = False
+        self._armed = False
+        self._next(0)
+        self._nbuf = 0
+        if self.log:
+            try:
+                with open(self.log, "wb") as f:
+                    f.write(struct.pack(_LOG_HDR, b"IVL1", self.interval_ms, self.count,
+                                        -1 if self.ramp_to_ms is None else self.ramp_to_ms))
+            except OSError as e:
+                print("interval log error:", e)
+                self.log = None
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        self._flush_log()
+
+    def busy(self):
+        """Расписание идёт или последний снимок ещё не завершён."""
+        return self.running or self._firing
+
+    def remaining_ms(self):
+        if not self.running:
+            return 0
+        return max(0, time.ticks_diff(self.deadline, time.ticks_ms()))
+
+    def _next(self, i):
+        # от предыдущего планового дедлайна: без дрейфа, а смещение в ticks_add не растёт
+        # (ticks_add принимает не больше ~2**29 мс — длинная серия упала бы через ~6 суток)
+        step = self.interval_at(i)
+        self.planned += step
+        self.deadline = time.ticks_add(self.t0, step)
+        self.t0 = self.deadline
+        self._armed = False
+
+    def poll(self):
+        if not self.running:
+            return
+        now = time.ticks_ms()
+        left = time.ticks_diff(self.deadline, now)
+        if not self._armed and self.arm and left <= self.lead_ms:
+            self._armed = True
+            self.arm()
+        if left > 0:
+            if self.wake_at:
+                self.wake_at(self.deadline)
+            return
+        if self._firing:
+            # предыдущий снимок ещё в работе — этот пропускаем, расписание не сдвигаем
+            self._record(SHOT_SKIP, left)
+            self._advance()
+            return
+        self._firing = True
+        self._fire_planned = self.deadline
+        self._fire_rel = self.planned
+        self._fire_idx = self.shots
+        self._advance()
+        self.fire(self._fire_planned, self._done_ref)
+
+    def _advance(self):
+        self.shots += 1
+        if self.count and self.shots >= self.count:
+            self.running = False
+            if not self._firing:
+                self._flush_log()
+            return
+        self._next(self.shots)
+        # сильно отстали (заблокированный цикл) — догоняем пропусками, а не очередью снимков
+        while self.running and time.ticks_diff(time.ticks_ms(), self.deadline) > self.interval_at(self.shots):
+            self._record(SHOT_SKIP, -time.ticks_diff(time.ticks_ms(), self.deadline))
+            self.shots += 1
+            if self.count and self.shots >= self.count:
+                self.running = False
+                return
+            self._next(self.shots)
+
+    def _done(self, ok):
+        late = time.ticks_diff(time.ticks_ms(), self._fire_planned)
+        self._firing = False
+        self.last_late_ms = late
+        if late > self.max_late_ms:
+            self.max_late_ms = late
+        self._record(SHOT_OK if ok else SHOT_FAIL, -late, self._fire_idx, self._fire_rel)
+        if not self.running:
+            self._flush_log()
+
+    def _record(self, status, left, idx=None, rel=None):
+        if not self.log:
+            return
+        if idx is None:
+            idx, rel = self.shots, self.planned
+        late = max(-32768, min(32767, -left))
+        struct.pack_into(_LOG_REC, self._buf, self._nbuf * _REC_SIZE, idx, rel, late, status)
+        self._nbuf += 1
+        if self._nbuf == _LOG_BATCH:
+            self._flush_log()
+
+    def _flush_log(self):
+        if not self.log or not self._nbuf:
+            return
+        try:
+            with open(self.log, "ab") as f:
+                f.write(memoryview(self._buf)[:self._nbuf * _REC_SIZE])
+        except OSError as e:
+            print("interval log error:", e)
+        self._nbuf = 0
+
+
+def read_log(path=LOG_PATH):
+    """Разобрать лог: (interval_ms, count, ramp_to_ms, [(idx, planned_ms, late_ms, status), ...]).
+    Работает и на устройстве, и на хосте (только struct)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    hdr = struct.calcsize(_LOG_HDR)
+    magic, interval_ms, count, ramp = struct.unpack_from(_LOG_HDR, data, 0)
+    if magic != b"IVL1":
+        raise ValueError("not an interval log")
+    recs = []
+    for off in range(hdr, len(data) - _REC_SIZE + 1, _REC_SIZE):
+        recs.append(struct.unpack_from(_LOG_REC, data, off))
+    return interval_ms, count, ramp, recs
+
+
+def log_stats(path=LOG_PATH):
+    """Кратко: снимков ок/сбой/пропуск, опоздание min/avg/max (мс)."""
+    interval_ms, count, ramp, recs = read_log(path)
+    late = [r[2] for r in recs if r[3] == SHOT_OK]
+    n = [0, 0, 0]
+    for r in recs:
+        n[r[3]] += 1
+    print("interval", interval_ms, "ms, count", count, "ramp", ramp)
+    print("ok", n[SHOT_OK], "fail", n[SHOT_FAIL], "skip", n[SHOT_SKIP])
+    if late:
+        print("late ms min/avg/max", min(late), sum(late) // len(late), max(late))
+    if recs:
+        print("last planned at", recs[-1][1] // 1000, "s")
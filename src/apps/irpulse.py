@@ -0,0 +1,205 @@
+import os, struct
+from array import array
+
+# Разворот кодов TV-B-Gone (таблица времён + упакованные индексы пар) в готовую
+# последовательность импульсов для передатчика и файл базы этих цепочек.
+# Разворот и запись — на хосте (build.py ir, irtool.py), устройство только читает IRDB.
+
+UNIT_US = 10              # единица таблиц времён, мкс
+RMT_MAX = 32767           # максимум одного элемента RMT (15 бит, тик 1 мкс)
+LEVEL = 0x8000            # бит уровня в элементе цепочки (1 — mark)
+PLAN_WINDOW = 16          # окно группировки по несущей в плане обхода (1 — строго по рейтингу)
+
+# база цепочек: заголовок <b"IRP2", регионов, maxn>, регионы <имя, первый, сколько>,
+# индекс всех кодов <freq, n, offset>, далее цепочки подряд (элементы '<H');
+# одинаковые цепочки разных регионов хранятся один раз; maxn — буфер чтения
+_DB_HDR = "<4sHH"
+_DB_REG = "<4sHH"
+_DB_REC = "<HHI"
+_REC_SIZE = 8
+
+
+class BitReader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0  # bit position
+    def get(self, n):
+        v = 0
+        for _ in range(n):
+            bi = self.pos >> 3
+            bo = 7 - (self.pos & 7)
+            v = (v << 1) | ((self.data[bi] >> bo) & 1)
+            self.pos += 1
+        return v
+
+
+def _emit(items, level, us, max_item):
+    while us > max_item:
+        items.append(max_item | level)
+        us -= max_item
+    if us:
+        items.append(us | level)
+
+
+def expand(code, unit_us=UNIT_US, max_item=RMT_MAX):
+    """
+    code = (freq, numpairs, bpi, times, codes) -> (freq, items): array('H'),
+    элемент = длительность в мкс (биты 0..14) | LEVEL (бит 15 — mark), как у RMT.
+    Соседние элементы одного уровня склеиваются (нулевая пауза между mark),
+    длинные делятся на куски <= max_item. Хвостовая пауза остаётся: она держит
+    интервал до следующего кода.
+    """
+    freq, numpairs, bpi, times, codes = code
+    items = array('H')
+    br = BitReader(codes)
+    cur = LEVEL
+    acc = 0
+    for _ in range(numpairs):
+        i = 2 * br.get(bpi)
+        for level, us in ((LEVEL, times[i] * unit_us), (0, times[i + 1] * unit_us)):
+            if not us:
+                continue
+            if level == cur:
+                acc += us
+                continue
+            _emit(items, cur, acc, max_item)
+            cur = level
+            acc = us
+    _emit(items, cur, acc, max_item)
+    return freq, items
+
+
+def split(items, n=None):
+    """items -> (durs, levels) кортежами — формат RMT.write_pulses(durs, levels)."""
+    if n is None:
+        n = len(items)
+    return (tuple(items[k] & RMT_MAX for k in range(n)),
+            tuple(items[k] >> 15 for k in range(n)))
+
+
+def plan(freqs, ranking=(), window=PLAN_WINDOW):
+    """
+    Порядок обхода кодов: сначала ranking (индексы по популярности), затем остальные
+    в исходном порядке. Внутри окон по window кодов коды собираются по несущей
+    (текущая несущая — первой), чтобы реже перенастраивать передатчик; код сдвигается
+    не дальше своего окна. Возвращает array('H') индексов.
+    """
+    n = len(freqs)
+    seen = set()
+    order = []
+    for i in tuple(ranking) + tuple(range(n)):
+        if 0 <= i < n and i not in seen:
+            seen.add(i)
+            order.append(i)
+    if window <= 1:
+        return array('H', order)
+    out = array('H')
+    cur = None
+    for a in range(0, n, window):
+        groups = {}
+        keys = []
+        for i in order[a:a + window]:
+            f = freqs[i]
+            if f not in groups:
+                groups[f] = []
+                keys.append(f)
+            groups[f].append(i)
+        if cur in groups:
+            keys.remove(cur)
+            keys.insert(0, cur)
+        for f in keys:
+            for i in groups[f]:
+                out.append(i)
+        cur = keys[-1]
+    return out
+
+
+def switches(freqs, order):
+    """Сколько раз меняется несущая при обходе order (первая настройка не считается)."""
+    k = 0
+    for a in range(1, len(order)):
+        if freqs[order[a]] != freqs[order[a - 1]]:
+            k += 1
+    return k
+
+
+def write_db(path, regions):
+    """regions: [(имя, [(freq, items), ...]), ...] -> файл базы (build.py ir на хосте)."""
+    trains = []
+    recs = []
+    for name, region in regions:
+        for t in region:
+            recs.append(t)
+    off = struct.calcsize(_DB_HDR) + struct.calcsize(_DB_REG) * len(regions) + _REC_SIZE * len(recs)
+    where = {}
+    index = []
+    for freq, items in recs:
+        key = bytes(struct.pack("<%dH" % len(items), *items))
+        if key not in where:
+            where[key] = off
+            trains.append(key)
+            off += len(key)
+        index.append(struct.pack(_DB_REC, freq, len(items), where[key]))
+    maxn = max([len(t[1]) for t in recs] or [0])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(struct.pack(_DB_HDR, b"IRP2", len(regions), maxn))
+        first = 0
+        for name, region in regions:
+            f.write(struct.pack(_DB_REG, name.encode(), first, len(region)))
+            first += len(region)
+        for rec in index:
+            f.write(rec)
+        for key in trains:
+            f.write(key)
+    try: os.remove(path)
+    except OSError: pass
+    os.rename(tmp, path)
+
+
+class IRDB:
+    """
+    Чтение базы цепочек по одной: в RAM только индекс региона (8 байт на код) и
+    один буфер на самую длинную цепочку. read(i) -> (freq, n), элементы в self.buf[:n].
+    region — имя ("EU", "NA"), None — первый в файле; self.regions — все имена.
+    """
+    def __init__(self, path, region=None):
+        f = self._f = open(path, "rb")
+        magic, nreg, self.maxn = struct.unpack(_DB_HDR, f.read(struct.calcsize(_DB_HDR)))
+        if magic != b"IRP2":
+            f.close()
+            raise ValueError("not an IR database")
+        self.regions = []
+        sel = None
+        for _ in range(nreg):
+            name, first, count = struct.unpack(_DB_REG, f.read(struct.calcsize(_DB_REG)))
+            name = name.rstrip(b"\0").decode()
+            self.regions.append(name)
+            if sel is None and (region is None or name == region):
+                sel = (name, first, count)
+        if sel is None:
+            f.close()
+            raise ValueError("no region %s" % region)
+        self.region, first, self.count = sel
+        f.seek(f.tell() + _REC_SIZE * first)
+        self._index = f.read(_REC_SIZE * self.count)
+        self.buf = array('H', bytes(2 * self.maxn))
+        self._mv = memoryview(self.buf)
+
+    def __len__(self):
+        return self.count
+
+    def freq(self, i):
+        return struct.unpack_from(_DB_REC, self._index, _REC_SIZE * i)[0]
+
+    def read(self, i):
+        freq, n, off = struct.unpack_from(_DB_REC, self._index, _REC_SIZE * i)
+        self._f.seek(off)
+        self._f.readinto(self._mv[:n])
+        return freq, n
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): self.close()
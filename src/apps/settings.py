@@ -2,6 +2,7 @@ import machine
 from M5 import *
 from ble_config import BLEConfigServer
 import json
+import os
 
 class App:
     def __init__(self):
@@ -10,6 +11,9 @@ class App:
     def save_config(self,config):
         with open('config.json', "w") as f:
             json.dump(config['settings'],f)
+        # после перезагрузки main пересканирует apps/ (новые/удалённые приложения)
+        try: os.remove('apps/index.json')
+        except OSError: pass
         machine.reset()
 
 
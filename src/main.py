@@ -10,17 +10,114 @@ import ubluetooth as bt
 import gc
 from hardware import Timer
 import json
+import hashlib, binascii
 
 nvs = esp32.NVS("appsets")
 
+# Главный цикл: сколько спать между опросами update(), мс
+LOOP_IDLE_MS = 30    # ничего не происходит — опрос кнопок
+LOOP_BTN_MS = 10     # кнопка зажата — ждём отпускания (long press)
+LOOP_APP_MS = 10     # у приложения есть loop_callback (порталы, анимации)
+LOOP_SLICE_MS = 10   # сон дробится на куски, чтобы IRQ кнопки будил раньше
+WAKE_PINS = (37, 39, 35)  # BtnA, BtnB, BtnPWR на M5StickC Plus2
+NVS_FLUSH_MS = 2000  # задержка отложенной записи настроек во flash
+ICON_CACHE_KB = 24   # бюджет RAM под иконки (64x64 RGB565 = 8 КБ), config.json: icon_cache_kb
+
 
 class Module:
     """Простейший контейнер для имитации модуля"""
     pass
 
 
-def load_module(path, name):
-    """Загрузить .py как модуль (совместимо с MicroPython)."""
+MPY_DIR = "apps/__mpy__"
+
+
+def _file_hash(path):
+    """sha256 файла (hex), читаем кусками чтобы не держать весь исходник в куче."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1024)
+            if not chunk:
+                break
+            h.update(chunk)
+    return binascii.hexlify(h.digest()).decode()
+
+
+def _write_json_atomic(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    try: os.remove(path)
+    except: pass
+    os.rename(tmp, path)
+
+
+class MpyCache:
+    """
+    Кэш байткода приложений: apps/__mpy__/<name>.mpy + apps/__mpy__/index.json.
+    .mpy собирает build.py на хосте (mpy-cross), index хранит size/hash исходника.
+    На устройстве при первом запуске досчитываем mtime, дальше свежесть
+    проверяется одним os.stat; hash пересчитывается только если mtime сменился.
+    """
+    def __init__(self, folder=MPY_DIR):
+        self.folder = folder
+        self.index_path = folder + "/index.json"
+        self._index = None
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, "r") as f:
+                    self._index = json.load(f)
+            except:
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        try:
+            _write_json_atomic(self.index_path, self._index)
+        except Exception as e:
+            print("mpy index save error:", e)
+
+    def lookup(self, path):
+        """Путь к актуальному .mpy для исходника path или None."""
+        base = path.rsplit("/", 1)[-1][:-3]
+        ent = self._load_index().get(base)
+        if not ent:
+            return None
+        mpy = self.folder + "/" + base + ".mpy"
+        try:
+            os.stat(mpy)
+            st = os.stat(path)
+        except:
+            return None
+        if ent.get("size") != st[6]:
+            self.invalidate(base)
+            return None
+        if ent.get("mtime") == st[8]:
+            return mpy
+        # mtime сменился (или первый запуск после заливки) — сверяем содержимое
+        if _file_hash(path) != ent.get("hash"):
+            self.invalidate(base)
+            return None
+        ent["mtime"] = st[8]
+        self._save_index()
+        return mpy
+
+    def invalidate(self, base):
+        """Устаревший .mpy удаляем: дальше грузится исходник, пока build.py не пересоберёт."""
+        print("mpy cache stale:", base)
+        try: os.remove(self.folder + "/" + base + ".mpy")
+        except: pass
+        if self._load_index().pop(base, None) is not None:
+            self._save_index()
+
+
+mpy_cache = MpyCache()
+
+
+def _load_source(path, name):
     # 1) Чистый namespace-словарь для exec
     ns = {
         "__name__": name,
@@ -32,6 +129,7 @@ def load_module(path, name):
     with open(path, "r") as f:
         src = f.read()
     code = compile(src, path, "exec")
+    del src
     exec(code, ns, ns)
     class _Mod: pass
     mod = _Mod()
@@ -43,19 +141,242 @@ def load_module(path, name):
     return mod
 
 
+def _load_mpy(mpy_path, name):
+    folder, fname = mpy_path.rsplit("/", 1)
+    modname = fname[:-4]
+    sys.path.insert(0, folder)
+    try:
+        mod = __import__(modname)
+    finally:
+        sys.path.pop(0)
+        try: del sys.modules[modname]
+        except KeyError: pass
+    sys.modules[name] = mod
+    gc.collect()
+    return mod
+
 
-def load_apps(folder):
+def load_module(path, name):
+    """Загрузить .py как модуль (совместимо с MicroPython).
+    Если для исходника есть свежий .mpy в кэше — грузим байткод без compile()."""
+    mpy = mpy_cache.lookup(path)
+    if mpy:
+        try:
+            return _load_mpy(mpy, name)
+        except Exception as e:
+            print("mpy load error:", e)
+            mpy_cache.invalidate(mpy.rsplit("/", 1)[-1][:-4])
+    return _load_source(path, name)
+
+
+def bench_load(folder="apps"):
+    """Замер загрузки приложений: исходник vs .mpy (время и выделенная куча).
+    Запускать из REPL после Ctrl-C: bench_load()"""
+    print("app              src ms   src KB   mpy ms   mpy KB")
+    for d in load_apps(folder):
+        res = []
+        for use_mpy in (False, True):
+            mpy = mpy_cache.lookup(d['path']) if use_mpy else None
+            if use_mpy and not mpy:
+                res.append(None)
+                continue
+            gc.collect()
+            m0 = gc.mem_free()
+            t0 = time.ticks_ms()
+            try:
+                if mpy:
+                    _load_mpy(mpy, 'Bench')
+                else:
+                    _load_source(d['path'], 'Bench')
+            except Exception as e:
+                print(d['name'], "load error:", e)
+                res.append(None)
+                continue
+            dt = time.ticks_diff(time.ticks_ms(), t0)
+            res.append((dt, (m0 - gc.mem_free()) // 1024))
+            sys.modules.pop('Bench', None)
+            gc.collect()
+        line = "{:<16}".format(d['name'][:16])
+        for r in res:
+            line += "   {:>6}   {:>6}".format(*r) if r else "   {:>6}   {:>6}".format("-", "-")
+        print(line)
+
+
+
+APPS_INDEX = "index.json"
+
+
+def _scan_app(folder, fname):
+    """Запись манифеста по исходнику (построчно, без чтения файла целиком).
+    None — если в файле нет class App (вспомогательный модуль)."""
+    path = folder + "/" + fname
+    is_app = False
+    radios = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if line.startswith("class App"):
+                    is_app = True
+                if "ble" not in radios and ("bluetooth" in line or ".ble" in line):
+                    radios.append("ble")
+                if "wifi" not in radios and "import network" in line:
+                    radios.append("wifi")
+        size = os.stat(path)[6]
+    except:
+        return None
+    if not is_app:
+        return None
+    name = fname[:-3]
+    return {"name": name, "path": path, "icon": name + ".bmp", "entry": "App",
+            "mem": size, "radios": radios}
+
+
+def build_app_index(folder):
+    """Просканировать папку и записать манифест folder/index.json."""
     apps = []
     for fname in os.listdir(folder):
         if fname.endswith(".py"):
-            d={}
-            d['name'] = fname[:-3]
-            d['path']=folder + "/" + fname
-            d['icon']=fname[:-3]+'.bmp'
-            apps.append(d)
+            d = _scan_app(folder, fname)
+            if d:
+                apps.append(d)
+            gc.collect()
+    try:
+        _write_json_atomic(folder + "/" + APPS_INDEX, {"apps": apps})
+    except Exception as e:
+        print("apps index save error:", e)
     return apps
 
 
+def load_apps(folder, rebuild=False):
+    """Список приложений из манифеста без обхода папки.
+    Пересборка: манифеста нет, запись не открылась в MainMenu.select, rebuild=True
+    (build.py apps пишет манифест на хосте, settings стирает его перед перезагрузкой)."""
+    if not rebuild:
+        try:
+            with open(folder + "/" + APPS_INDEX, "r") as f:
+                idx = json.load(f)
+            if idx.get("apps"):
+                return idx["apps"]
+        except:
+            pass
+    return build_app_index(folder)
+
+
+class SettingsStore:
+    """
+    Настройки поверх esp32.NVS с отложенной записью.
+    set() меняет только RAM-кэш и взводит дедлайн; flush() пишет все изменённые
+    ключи одним commit — по дедлайну из главного цикла, при выходе из приложения
+    и перед выключением. get() читает NVS не больше одного раза на ключ.
+    """
+    def __init__(self, nvs, flush_ms=NVS_FLUSH_MS):
+        self.nvs=nvs
+        self.flush_ms=flush_ms
+        self.deadline=None
+        self.commits=0
+        self._cache={}
+        self._dirty={}
+
+    def _read(self,name,data_type):
+        try:
+            if data_type=='int':
+                return int(self.nvs.get_i32(name))
+            buf=bytearray(256)
+            n=self.nvs.get_blob(name,buf)
+            return bytes(buf[:n]).decode()
+        except:
+            return None
+
+    def get(self,name,data_type,default):
+        if name not in self._cache:
+            self._cache[name]=self._read(name,data_type)
+        v=self._cache[name]
+        return default if v is None else v
+
+    def set(self,name,data,data_type):
+        if name not in self._dirty and self._cache.get(name)==data:
+            return
+        self._cache[name]=data
+        self._dirty[name]=data_type
+        self.deadline=time.ticks_add(time.ticks_ms(),self.flush_ms)
+
+    def flush(self):
+        self.deadline=None
+        if not self._dirty:
+            return
+        for name,data_type in self._dirty.items():
+            try:
+                if data_type=='int':
+                    self.nvs.set_i32(name,self._cache[name])
+                else:
+                    self.nvs.set_blob(name,self._cache[name])
+            except Exception as e:
+                print("nvs write error:",name,e)
+        self._dirty={}
+        self.nvs.commit()
+        self.commits+=1
+
+    def poll(self,now):
+        if self.deadline is not None and time.ticks_diff(now,self.deadline)>=0:
+            self.flush()
+
+
+class IconCache:
+    """
+    LRU готовых RGB565-иконок (.p16 рядом с .bmp, собирает build.py icons).
+    Пиксели уходят на экран одним drawRawBuf без разбора BMP; если .p16 нет
+    или прошивка не умеет raw-буферы — рисуем исходный .bmp как раньше.
+    """
+    def __init__(self, budget=ICON_CACHE_KB*1024):
+        self.budget=budget
+        self.used=0
+        self.raw_ok=True
+        self._items={}
+        self._order=[]
+
+    @staticmethod
+    def _load(path):
+        with open(path, "rb") as f:
+            parts=f.readline().split()
+            if len(parts)!=3 or parts[0]!=b"P16":
+                raise ValueError("Bad P16 header")
+            w=int(parts[1]); h=int(parts[2])
+            buf=bytearray(2*w*h)
+            f.readinto(buf)
+        return w, h, buf
+
+    def get(self, path):
+        it=self._items.get(path)
+        if it:
+            self._order.remove(path)
+            self._order.append(path)
+            return it
+        it=self._load(path)
+        size=len(it[2])
+        if size>self.budget:
+            return it
+        while self._order and self.used+size>self.budget:
+            old=self._order.pop(0)
+            self.used-=len(self._items.pop(old)[2])
+        self._items[path]=it
+        self._order.append(path)
+        self.used+=size
+        return it
+
+    def draw(self, bmp_path, x, y):
+        if self.raw_ok:
+            try:
+                w, h, buf=self.get(bmp_path[:-4]+".p16")
+                Lcd.drawRawBuf(buf, x, y, w, h, len(buf), True)
+                return
+            except OSError:
+                pass
+            except Exception as e:
+                print("raw icon error:", e)
+                self.raw_ok=False
+        Lcd.drawImage(bmp_path, x, y)
+
+
 #135x240
 class Colors:
     bg=0x000000
@@ -84,7 +405,7 @@ class Waiter:
         Lcd.fillRect(0, 31,135,240-31, color.bg)
         x = (Lcd.width() - 32) // 2
         y = (Lcd.height() - 32) // 2
-        Lcd.drawImage("apps/wait.bmp", x, y)
+        self.app.icons.draw("apps/wait.bmp", x, y)
         Lcd.setFont(Widgets.FONTS.DejaVu18)
         Lcd.setTextColor(color.main, color.bg)
         w = Lcd.textWidth(title)       
@@ -123,57 +444,94 @@ class Menu:
         self.y = y
         self.line_height = line_height
         self.width = Lcd.width()-10
+        self._canvas = None
+        self.last_cost = (0, 0)
         if self.cursor_index >= self.max_visible:
             self.scroll_offset = self.cursor_index - self.max_visible + 1
         self.draw()
     
 
-    def draw(self):
-        #
-        Lcd.setFont(Widgets.FONTS.DejaVu24)
-        for i in range(self.max_visible):
-            idx = self.scroll_offset + i
-            if idx >= len(self.items):
-                break
-            text = self.items[idx]
-            y_pos = self.y + i * self.line_height
-
-            if idx == self.cursor_index:
-                # подсветка всей строки
-                Lcd.fillRect(self.x, y_pos, self.width, self.line_height, color.main)  # желтый фон
-                Lcd.setTextColor(color.bg, color.main)  # черный текст
-                Lcd.setCursor(self.x + 5, y_pos + 2)
-                Lcd.drawString(text, self.x + 5, y_pos + 2)
-            else:
-                # обычная строка
-                Lcd.fillRect(self.x, y_pos, self.width, self.line_height, color.bg)  # фон
-                Lcd.setTextColor(color.main, color.bg)  # белый текст
-                Lcd.setCursor(self.x + 5, y_pos + 2)
-                Lcd.drawString(text, self.x + 5, y_pos + 2)
+    def _row_canvas(self):
+        # одна строка рисуется в спрайт и выталкивается на экран целиком — без мерцания
+        if self._canvas is None:
+            try:
+                self._canvas=Lcd.newCanvas(self.width, self.line_height, 16, True)
+            except Exception:
+                self._canvas=False
+        return self._canvas
+
+    def _draw_row(self, i):
+        idx = self.scroll_offset + i
+        if idx >= len(self.items):
+            return 0
+        y_pos = self.y + i * self.line_height
+        canvas = self._row_canvas()
+        if canvas:
+            g, x0, y0 = canvas, 0, 0
+        else:
+            g, x0, y0 = Lcd, self.x, y_pos
+        if idx == self.cursor_index:
+            fg, bg = color.bg, color.main   # подсветка всей строки
+        else:
+            fg, bg = color.main, color.bg
+        g.fillRect(x0, y0, self.width, self.line_height, bg)
+        g.setFont(Widgets.FONTS.DejaVu24)
+        g.setTextColor(fg, bg)
+        g.drawString(self.items[idx], x0 + 5, y0 + 2)
+        if canvas:
+            canvas.push(self.x, y_pos)
+            return 4
+        return 3
+
+    def draw(self, rows=None):
+        """rows — индексы видимых строк для перерисовки; None — все."""
+        t0 = time.ticks_ms()
+        calls = 0
+        for i in (range(self.max_visible) if rows is None else rows):
+            calls += self._draw_row(i)
+        self.last_cost = (calls, time.ticks_diff(time.ticks_ms(), t0))
+        if self.app.config.get('stats'):
+            print('menu draw calls', self.last_cost[0], 'ms', self.last_cost[1])
+
+    def _moved(self, old_index, old_offset):
+        if old_offset != self.scroll_offset:
+            self.draw()
+        elif old_index != self.cursor_index:
+            self.draw((old_index - self.scroll_offset, self.cursor_index - self.scroll_offset))
 
     def up(self):
+        old_index, old_offset = self.cursor_index, self.scroll_offset
         if self.cursor_index > 0:
             self.cursor_index -= 1
             if self.cursor_index < self.scroll_offset:
                 self.scroll_offset -= 1
-        self.draw()
+        self._moved(old_index, old_offset)
 
 
     def down(self):
+        old_index, old_offset = self.cursor_index, self.scroll_offset
         if self.cursor_index < len(self.items) - 1:
             self.cursor_index += 1
             if self.cursor_index >= self.scroll_offset + self.max_visible:
                 self.scroll_offset += 1
-        self.draw()
+        self._moved(old_index, old_offset)
+
+    def _free_canvas(self):
+        if self._canvas:
+            try:self._canvas.delete()
+            except Exception:pass
+        self._canvas=None
         
 
     def select(self): 
+        self._free_canvas()
         self.app.callback_table=self.old_cl
         self.app.callback_table_long=self.old_cl_long
         self.callback(self.cursor_index)
         gc.collect()
 
     def cancel(self):
+        self._free_canvas()
         self.app.callback_table=self.old_cl
         self.app.callback_table_long=self.old_cl_long
         if self.cancel_callback:
@@ -196,7 +554,7 @@ class MainMenu:
 
 
          
-        Lcd.drawImage(f"apps/{self.apps[self.current]['icon']}", x, y)
+        self.app.icons.draw(f"apps/{self.apps[self.current]['icon']}", x, y)
 
         Lcd.setFont(Widgets.FONTS.DejaVu24)
         Lcd.setTextColor(color.main, color.bg)
@@ -211,28 +569,44 @@ class MainMenu:
         self.current-=1
         if self.current<0:self.current=len(self.apps)-1
         self.draw()
-        nvs.set_i32("cur_menu",self.current)
-        nvs.commit()
+        self.app.save_set("cur_menu",self.current,"int")
 
     def down(self):
         self.current+=1
         if self.current>(len(self.apps)-1):self.current=0
         self.draw()
-        nvs.set_i32("cur_menu",self.current)
-        nvs.commit()
+        self.app.save_set("cur_menu",self.current,"int")
+
+    def _reindex(self):
+        # запись манифеста не открылась — приложение удалили/переименовали
+        path=self.apps[self.current]['path']
+        self.apps = self.app.apps = load_apps("apps", rebuild=True)
+        if any(d['path']==path for d in self.apps):
+            return False
+        self.current = self.app.current_app = 0
+        self.app.gui.title_text=None
+        self.app.gui.update_title()
+        self.draw()
+        return True
 
     def select(self):
-        
         Lcd.fillRect(0, 31,135,240-31, color.bg)
         self.app.current_app=self.current
+        # приложения могут перезагрузить плату мимо stop_app — сбрасываем заранее
+        self.app.settings.flush()
         gc.collect()
         self.app.gui.title_text=self.app.apps[self.current]['name']
         self.app.gui.update_title()
-        mod=load_module(self.apps[self.current]['path'], 'RunCurrent')
+        try:
+            mod=load_module(self.apps[self.current]['path'], 'RunCurrent')
+        except (OSError, ImportError):
+            if self._reindex():
+                return
+            raise
         
         self.app.callback_table={'left':None,'right':None,'ok':None}
         self.app.callback_table_long={'right':None,'left':None,'ok':None}
-        self.app.run = getattr(mod, "App")()
+        self.app.run = getattr(mod, self.apps[self.current].get('entry', "App"))()
         self.app.run.start(self.app)
         self.app.callback_table_long['right']=self.app.run.stop
         gc.collect()
@@ -247,41 +621,65 @@ class Gui:
         self.title_text=None
         self.power_led_on=False
         self.waiter=None
+        self.draw_calls=0
+        self.draw_rate=0
+        self._draw_calls_sec=0
+        self.invalidate_title()
         self.update_title()
- 
-    
+
+    def invalidate_title(self):
+        """Заголовок затёрт (очистка всего экрана) — следующий update_title рисует его целиком."""
+        self._frame_drawn=False
+        self._title_drawn=None
+        self._bat_drawn=None
+        self._led_drawn=None
+
     def update_title(self):
-        gc.collect()
-        Lcd.fillRect(5, 5, 125, 25, color.bg)
-        Lcd.drawLine(5, 30, 130, 30, 0xcecece)
-        Lcd.setCursor(10, 11)
-        Lcd.setFont(Widgets.FONTS.DejaVu12)
-        #tm=time.gmtime()
-        if not self.title_text:
-            try:Lcd.print(self.app.config['name'][:10], color.main)
-            except:pass
-        else:
-            Lcd.print(self.title_text, color.main)      
-        color_e=color.main if Power.getBatteryLevel()>30 else 0xff0000
-        if Power.getBatteryLevel()>80:
+        # батарею опрашиваем один раз за тик, рисуем только изменившиеся области
+        level=Power.getBatteryLevel()
+        if not self._frame_drawn:
+            Lcd.fillRect(5, 5, 125, 25, color.bg)
+            Lcd.drawLine(5, 30, 130, 30, 0xcecece)
+            self.draw_calls+=2
+            self._frame_drawn=True
+            self._title_drawn=None
+            self._bat_drawn=None
+        text=self.title_text
+        if not text:
+            try:text=self.app.config['name'][:10]
+            except:text=''
+        if text!=self._title_drawn:
+            Lcd.fillRect(5, 5, 92, 25, color.bg)
+            Lcd.setCursor(10, 11)
+            Lcd.setFont(Widgets.FONTS.DejaVu12)
+            Lcd.print(text, color.main)
+            self.draw_calls+=2
+            self._title_drawn=text
+            self._bat_drawn=None     # длинный текст мог залезть на батарейку
+        color_e=color.main if level>30 else 0xff0000
+        if level>80:
             color_e=0x00ff00
-        Lcd.fillRect(100, 8, 25, 18, color.main)
-        Lcd.fillRect(97, 12, 5, 9, color.main)
-        bat=int(Power.getBatteryLevel())
-        Lcd.fillRect(102, 10, 21, 14, color.bg)
-        lev=17-int(Power.getBatteryLevel()/100.0*17.0)
-        Lcd.fillRect(104+lev, 12, 17-lev, 10, color_e)       
-        if Power.getBatteryLevel()<20:
+        lev=17-int(level/100.0*17.0)
+        if self._bat_drawn is None:
+            Lcd.fillRect(100, 8, 25, 18, color.main)
+            Lcd.fillRect(97, 12, 5, 9, color.main)
+            self.draw_calls+=2
+        if (lev, color_e)!=self._bat_drawn:
+            Lcd.fillRect(102, 10, 21, 14, color.bg)
+            Lcd.fillRect(104+lev, 12, 17-lev, 10, color_e)
+            self.draw_calls+=2
+            self._bat_drawn=(lev, color_e)
+        if level<20:
             self.power_led_on=not self.power_led_on
-            if self.power_led_on:
-                Power.setLed(255)
-            else:
-                Power.setLed(0)      
         else:
-            Power.setLed(0)
-
-            
-        gc.collect()
+            self.power_led_on=False
+        if self.power_led_on!=self._led_drawn:
+            Power.setLed(255 if self.power_led_on else 0)
+            self._led_drawn=self.power_led_on
+
+    def tick_stats(self):
+        self.draw_rate=self.draw_calls-self._draw_calls_sec
+        self._draw_calls_sec=self.draw_calls
             
     def show_list(self,data=[],current=0,callback=None,cancel_callback=None):
         gc.collect()
@@ -303,26 +701,37 @@ class App:
         self.run=None
         self.enable_screen_sleep=True
         self.enable_poweroff=True
-        self.enable_title=True
+        self._enable_title=True
         try:self.config=json.loads(open('config.json','r').read())
         except:
             self.config={"brightness": 100, "autooff_min": 5, "name": "M5", "sound": 1}
         Widgets.setBrightness(int(self.config['brightness']/100.0*255))
+        self.icons=IconCache(int(self.config.get('icon_cache_kb',ICON_CACHE_KB))*1024)
         self.loop_callback=None
         self.ble = bt.BLE()
         self.ble.active(True)
         self.gui=Gui()
         self.auto_off=time.time()
-        try:
-            self.current_app=int(nvs.get_i32("cur_menu"))
-        except:
-            self.current_app=0
+        self.settings=SettingsStore(nvs)
+        self.current_app=self.settings.get("cur_menu","int",0)
         self.apps =load_apps("apps")
+        if self.current_app >= len(self.apps):
+            self.current_app = 0
         self.callback_table={'left':None,'right':None,'ok':None}
         self.callback_table_long={'left':None,'right':None,'ok':None}
-        self.upd_time=0
+        self.upd_time=time.ticks_ms()
+        self.wake_deadline=None
+        self.loop_period_ms=LOOP_APP_MS
+        self.loop_count=0
+        self.loop_rate=0
+        self._loop_count_sec=0
+        self._wake=False
         time.timezone("GMT+3")
         self.buttons_state={'ok':0,'left':0,'right':0}
+        self.buttons_down=0
+        for p in WAKE_PINS:
+            try:machine.Pin(p, machine.Pin.IN).irq(trigger=machine.Pin.IRQ_FALLING, handler=self.wake)
+            except:pass
         BtnA.setCallback(type=BtnA.CB_TYPE.WAS_PRESSED, cb=lambda s:self.click_h('ok',1,s))
         BtnB.setCallback(type=BtnB.CB_TYPE.WAS_PRESSED, cb=lambda s:self.click_h('left',1,s))
         BtnPWR.setCallback(type=BtnPWR.CB_TYPE.WAS_PRESSED, cb=lambda s:self.click_h('right',1,s))
@@ -333,23 +742,21 @@ class App:
         self.gui.app=self
         self.gui.waiter=Waiter(app=self)
         
+    @property
+    def enable_title(self):
+        return self._enable_title
+
+    @enable_title.setter
+    def enable_title(self,on):
+        # приложение могло рисовать поверх заголовка — любое переключение сбрасывает кэш,
+        # даже если выкл/вкл случились между двумя тиками second_updater
+        self._enable_title=on
+        self.gui.invalidate_title()
+
     def save_set(self,name,data,data_type):
-        if data_type=='int':
-            nvs.set_i32(name,data)
-        else:
-            nvs.set_blob(name,data)
-        nvs.commit()
+        self.settings.set(name,data,data_type)
     def get_set(self,name,data_type,default):
-        if data_type=='int':
-            try:
-                return int(nvs.get_i32(name))
-            except:
-                return default
-        else:
-            try:
-                return str(nvs.get_blob(name))
-            except:
-                return default
+        return self.settings.get(name,data_type,default)
             
     def play_tone(self,tone,dur):
         play_tone(tone,dur)
@@ -365,8 +772,10 @@ class App:
         if self.enable_screen_sleep:
             Widgets.setBrightness(int(self.config['brightness']/100.0*255))
         if flag==1:
+            self.buttons_down+=1
             self.buttons_state[btn]=time.ticks_ms()
         else:
+            self.buttons_down=max(0,self.buttons_down-1)
             df=time.ticks_ms()-self.buttons_state[btn]
             self.click(btn,is_long=df>300)
             
@@ -386,24 +795,73 @@ class App:
             
     def stop_app(self):
         self.gui.waiter.start(title='wait...')
+        self.settings.flush()
         machine.reset()
         
     def second_updater(self):
         if self.enable_poweroff and self.config['autooff_min'] and (time.time()-self.auto_off)>60*self.config['autooff_min']:
+            self.settings.flush()
             Power.powerOff()
         if (time.time()-self.auto_off)>10:
             if self.enable_screen_sleep:
                 Widgets.setBrightness(5)
         if self.enable_title:
             self.gui.update_title()
+        self.loop_rate=self.loop_count-self._loop_count_sec
+        self._loop_count_sec=self.loop_count
+        self.gui.tick_stats()
+        if self.config.get('stats'):
+            print('loop/s', self.loop_rate, 'title draw/s', self.gui.draw_rate)
+
+    def wake(self, *args):
+        """Прервать сон главного цикла (IRQ кнопок, BLE-обработчики приложений)."""
+        self._wake=True
+
+    def wake_at(self, deadline):
+        """Попросить главный цикл проснуться не позже ticks_ms-дедлайна (разовый)."""
+        if self.wake_deadline is None or time.ticks_diff(deadline, self.wake_deadline)<0:
+            self.wake_deadline=deadline
+
+    def next_wait(self, now):
+        """Сколько можно спать до ближайшего события, мс."""
+        wait=LOOP_IDLE_MS
+        if self.loop_callback:
+            wait=min(wait,self.loop_period_ms)
+        if self.buttons_down:
+            wait=min(wait,LOOP_BTN_MS)
+        wait=min(wait,time.ticks_diff(time.ticks_add(self.upd_time,1000),now))
+        if self.wake_deadline is not None:
+            wait=min(wait,time.ticks_diff(self.wake_deadline,now))
+        if self.settings.deadline is not None:
+            wait=min(wait,time.ticks_diff(self.settings.deadline,now))
+        return wait
+
+    def idle(self):
+        now=time.ticks_ms()
+        wait=self.next_wait(now)
+        if wait<=0:
+            return
+        end=time.ticks_add(now,wait)
+        self._wake=False
+        while not self._wake:
+            left=time.ticks_diff(end,time.ticks_ms())
+            if left<=0:
+                break
+            time.sleep_ms(min(left,LOOP_SLICE_MS))
         
     def loop(self):
         update()
-        if (time.time()-self.upd_time)>=1:
+        self.loop_count+=1
+        now=time.ticks_ms()
+        if time.ticks_diff(now,self.upd_time)>=1000:
             self.second_updater()
-            self.upd_time=time.time()
+            self.upd_time=now
+        if self.wake_deadline is not None and time.ticks_diff(now,self.wake_deadline)>=0:
+            self.wake_deadline=None
+        self.settings.poll(now)
         if self.loop_callback:
             self.loop_callback()
+        self.idle()
     
     
     
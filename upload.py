@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import urllib.parse
+import zlib
+import argparse
+import http.client
+
+# Загрузка картинки (P16) в FrzLight по Wi-Fi портала и замер скорости (KB/s)
+HOST = "192.168.4.1"
+PORT = 80
+CHUNK = 8192  # = CHUNK_MAX в apps/FrzLight.py
+
+
+def _request(host, port, method, url, body=None, timeout=10):
+    c = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        c.request(method, url, body=body)
+        r = c.getresponse()
+        data = r.read()
+        try:
+            obj = json.loads(data or b"{}")
+        except ValueError:
+            obj = {}
+        return r.status, obj
+    finally:
+        c.close()
+
+
+def upload_chunked(data, host=HOST, port=PORT, chunk=CHUNK, retries=8, commit=True, name=None):
+    """/img/begin → /img/chunk (offset + CRC32) → /img/commit; при обрыве — /img/status и дальше.
+    Картинка добавляется в библиотеку устройства и выбирается; возвращает её id."""
+    size = len(data)
+    q = f"&name={urllib.parse.quote(name)}" if name else ""
+    status, r = _request(host, port, "POST", f"/img/begin?size={size}&crc={zlib.crc32(data):08x}{q}")
+    if status != 200:
+        raise RuntimeError(f"begin: HTTP {status}")
+    offset = r.get("offset", 0)
+    if offset:
+        print(f"[RESUME] from {offset} b")
+    fails = 0
+    while offset < size:
+        part = data[offset:offset + chunk]
+        try:
+            status, r = _request(host, port, "POST", f"/img/chunk?offset={offset}&crc={zlib.crc32(part):08x}", part)
+            if status == 200:
+                offset = r["offset"]
+                fails = 0
+                continue
+            print(f"[RETRY] chunk @{offset}: HTTP {status} {r}")
+            offset = r.get("offset", offset)
+        except OSError as e:
+            print(f"[RETRY] chunk @{offset}: {e}")
+            time.sleep(0.3)
+            try:
+                offset = _request(host, port, "GET", "/img/status")[1].get("offset", offset)
+            except OSError:
+                pass
+        fails += 1
+        if fails > retries:
+            raise RuntimeError(f"upload stalled at {offset} b")
+    if commit:
+        status, r = _request(host, port, "POST", "/img/commit")
+        if status != 200:
+            raise RuntimeError(f"commit: HTTP {status} {r}")
+        return r.get("id")
+
+
+def upload_legacy(data, host=HOST, port=PORT):
+    """Старый путь: весь файл одним POST /img."""
+    try:
+        status, _ = _request(host, port, "POST", "/img", data, timeout=60)
+        if status != 200:
+            raise RuntimeError(f"/img: HTTP {status}")
+    except (ConnectionError, http.client.RemoteDisconnected):
+        pass
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Загрузка P16 в FrzLight и замер скорости")
+    p.add_argument("file", help="файл P16 (как apps/led.ppm)")
+    p.add_argument("--host", default=HOST)
+    p.add_argument("--port", type=int, default=PORT)
+    p.add_argument("--chunk", type=int, default=CHUNK)
+    p.add_argument("--legacy", action="store_true", help="одним POST /img (для сравнения)")
+    p.add_argument("--no-commit", action="store_true", help="не коммитить (картинка не попадёт в библиотеку)")
+    args = p.parse_args()
+
+    with open(args.file, "rb") as f:
+        data = f.read()
+    t0 = time.monotonic()
+    if args.legacy:
+        upload_legacy(data, args.host, args.port)
+    else:
+        i = upload_chunked(data, args.host, args.port, args.chunk, commit=not args.no_commit,
+                           name=os.path.basename(args.file))
+        if i is not None:
+            print(f"[LIB] id {i}")
+    dt = time.monotonic() - t0
+    print(f"[OK] {len(data)} b in {dt:.2f} s = {len(data) / 1024 / max(dt, 1e-6):.1f} KB/s")